@@ -1,15 +1,41 @@
-from fastapi import APIRouter, Depends, Form
+from fastapi import APIRouter, Depends, Form, Request
 from sqlalchemy.orm import Session
+from app.core.auth import get_current_user, require_admin
+from app.core.tokens import TokenData, revoke_token, token_stats
 from app.db.dependency import get_db
-from app.schemas.user import UserResponse
+from app.schemas.user import LoginResponse
 from app.services.auth_service import login_plain
+from app.services.login_throttle import login_throttle
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-@router.post("/login", response_model=UserResponse)
+@router.post("/login", response_model=LoginResponse)
 def login(
+    request: Request,
     email: str = Form(...),
     password: str = Form(...),
     db: Session = Depends(get_db),
 ):
-    return login_plain(db, email, password)
+    client_ip = request.client.host if request.client else None
+    return login_plain(db, email, password, client_ip)
+
+
+@router.post("/logout")
+def logout(current: TokenData = Depends(get_current_user)):
+    """
+    เพิกถอน token ปัจจุบัน
+    ด้วย TOKEN_REVOCATION_BACKEND=memory จะมีผลเฉพาะ worker ที่รับ request นี้
+    worker อื่นยังรับ token เดิมได้จนหมดอายุ (ไม่เกิน ACCESS_TOKEN_TTL วินาที)
+    """
+    revoke_token(current)
+    return {"message": "Logged out"}
+
+
+@router.get("/tokens/stats")
+def read_token_stats(_: TokenData = Depends(require_admin)):
+    return token_stats()
+
+
+@router.get("/throttle/stats")
+def read_throttle_stats(_: TokenData = Depends(require_admin)):
+    return login_throttle.stats()
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterator, Literal
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from app.crud import game as crud_game
+from app.db.database import SessionLocal
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+GAME_FIELDS = ["id", "name", "category_id", "category_name", "description", "price", "release_date", "image_url"]
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _stream_games(fmt: str, chunk_size: int) -> Iterator[str]:
+    # generator ทำงานหลัง endpoint return ไปแล้ว จึงต้องเปิด session ของตัวเอง
+    db = SessionLocal()
+    try:
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.DictWriter(buf, fieldnames=GAME_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            yield buf.getvalue()
+
+        for chunk in crud_game.iter_game_chunks(db, chunk_size):
+            if fmt == "csv":
+                buf = io.StringIO()
+                writer = csv.DictWriter(buf, fieldnames=GAME_FIELDS, extrasaction="ignore")
+                writer.writerows(chunk)
+                yield buf.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(row, default=_json_default, ensure_ascii=False) + "\n"
+                    for row in chunk
+                )
+    finally:
+        db.close()
+
+
+@router.get("/games")
+def export_games(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="รูปแบบไฟล์: ndjson หรือ csv"),
+    chunk_size: int = Query(1000, ge=100, le=10000, description="จำนวนแถวที่อ่านจากฐานข้อมูลต่อรอบ"),
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_games(format, chunk_size),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="games.{format}"'},
+    )
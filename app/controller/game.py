@@ -1,18 +1,60 @@
+import asyncio
+import zipfile
+from datetime import date
 from typing import List, Literal
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
+from app.core.cache import catalog_cache, library_cache
+from app.core.config import settings
 from app.crud import game as crud_game
 from app.db.dependency import get_db
-from app.schemas.game import GameBase, GameCategory, GameResponse, GameUpdate
+from app.db.database import SessionLocal
+from app.services import import_service, upload_service
+from app.services.job_service import jobs
+from app.services.leaderboard_service import top_selling_cache
+from app.schemas.game import GameBase, GameBatch, GameBrowse, GameCategory, GamePage, GameResponse, GameUpdate
 
 router = APIRouter(prefix="/games", tags=["Games"])
 
+MAX_BATCH_IDS = 300
+
+
+def _catalog_etag(payload) -> str:
+    # hash ของข้อมูลที่ส่งจริง: ทุก worker ได้ tag เดียวกันเมื่อข้อมูลเหมือนกัน และเปลี่ยนเมื่อ cache โหลดข้อมูลใหม่
+    return f'"{catalog_cache.fingerprint(payload)}"'
+
+
+def _cache_headers(etag: str) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.CATALOG_HTTP_MAX_AGE}",
+    }
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def _conditional(request: Request, response: Response, payload):
+    etag = _catalog_etag(payload)
+    if _not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(etag))
+    response.headers.update(_cache_headers(etag))
+    return payload
+
+
 @router.get("/category", response_model=List[GameCategory])
-def get_game_category(db: Session = Depends(get_db)):
+def get_game_category(request: Request, response: Response, db: Session = Depends(get_db)):
     categories = crud_game.get_game_category(db)
-    return categories
+    return _conditional(request, response, categories)
 
 
 @router.post("/category", status_code=status.HTTP_201_CREATED)
@@ -45,29 +87,124 @@ async def create_user_with_image(
         image_url = ""
     )
 
-    created = crud_game.create_game_with_file(db, game, image) 
+    # อัปโหลดรูปใน thread pool พร้อมกับเช็คชื่อซ้ำใน DB แล้วค่อย insert เมื่อได้ URL
+    upload = asyncio.create_task(upload_service.upload_game_image_async(image))
+    try:
+        await run_in_threadpool(crud_game.ensure_game_name_available, db, name)
+    except BaseException:
+        upload.cancel()
+        raise
+
+    game.image_url = await upload
+    created = await run_in_threadpool(crud_game.create_game, db, game)
     if not created:
         raise HTTPException(status_code=400, detail="Create failed")
     return {"message": "Create updated successfully"}
 
 
+@router.post("/import")
+def import_games(
+    file: UploadFile = File(..., description="ไฟล์ CSV หรือ NDJSON"),
+    images: UploadFile | None = File(None, description="ไฟล์ zip ของรูปที่อ้างถึงในคอลัมน์ image"),
+    dry_run: bool = Form(False),
+    db: Session = Depends(get_db),
+):
+    try:
+        rows = import_service.parse_game_file(file.file.read(), file.filename or "")
+        archive = import_service.load_image_archive(images.file.read()) if images else None
+    except (UnicodeDecodeError, ValueError, zipfile.BadZipFile, NotImplementedError) as e:
+        raise HTTPException(status_code=400, detail=f"อ่านไฟล์ไม่สำเร็จ: {e}")
+
+    if not rows:
+        raise HTTPException(status_code=400, detail="ไม่พบข้อมูลในไฟล์")
+
+    return import_service.import_games(db, rows, archive, dry_run=dry_run)
+
+
 @router.get("/", response_model=List[GameResponse])
-def get_game_all(db: Session = Depends(get_db)):
-    return crud_game.get_game_all(db)
+def get_game_all(request: Request, response: Response, db: Session = Depends(get_db)):
+    return _conditional(request, response, crud_game.get_game_all(db))
+
+
+@router.get("/page", response_model=GamePage)
+def get_game_page(
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100, description="จำนวนเกมต่อหน้า"),
+    after: int | None = Query(None, ge=0, description="next_cursor จากหน้าก่อนหน้า"),
+    category_id: int | None = Query(None, description="กรองตามประเภทเกม"),
+    min_price: float | None = Query(None, ge=0, description="ราคาต่ำสุด"),
+    max_price: float | None = Query(None, ge=0, description="ราคาสูงสุด"),
+    db: Session = Depends(get_db),
+):
+    page = crud_game.get_game_page(
+        db,
+        limit=limit,
+        after=after,
+        category_id=category_id,
+        min_price=min_price,
+        max_price=max_price,
+    )
+    return _conditional(request, response, page)
+
+
+@router.get("/browse", response_model=GameBrowse)
+def browse_games(
+    category_id: int | None = Query(None, description="กรองตามประเภทเกม"),
+    min_price: float | None = Query(None, ge=0, description="ราคาต่ำสุด"),
+    max_price: float | None = Query(None, ge=0, description="ราคาสูงสุด"),
+    released_from: date | None = Query(None, description="วันวางขายตั้งแต่ (YYYY-MM-DD)"),
+    released_to: date | None = Query(None, description="วันวางขายถึง (YYYY-MM-DD)"),
+    sort: Literal["name", "price_asc", "price_desc", "popularity"] = Query("name", description="การเรียงลำดับ"),
+    limit: int = Query(20, ge=1, le=100, description="จำนวนเกมต่อหน้า"),
+    offset: int = Query(0, ge=0, description="ข้ามกี่รายการ"),
+    db: Session = Depends(get_db),
+):
+    return crud_game.browse_games(
+        db,
+        category_id=category_id,
+        min_price=min_price,
+        max_price=max_price,
+        released_from=released_from,
+        released_to=released_to,
+        sort=sort,
+        limit=limit,
+        offset=offset,
+    )
 
 
 @router.get("/search")
 def search_game(name: str = Query(..., description="ชื่อเกมที่ต้องการค้นหา"),
+                limit: int = Query(20, ge=1, le=100, description="จำนวนผลลัพธ์สูงสุด"),
                 db: Session = Depends(get_db)):
-    result = crud_game.get_game_by_name(db, name)
+    result = crud_game.get_game_by_name(db, name, limit=limit)
     if not result:
         return {"message": "ไม่พบข้อมูลเกมที่ค้นหา"}
     return result
 
 
+@router.get("/batch", response_model=GameBatch)
+def get_games_batch(
+    ids: str = Query(..., description="รหัสเกมคั่นด้วย comma เช่น 1,2,3"),
+    db: Session = Depends(get_db),
+):
+    try:
+        game_ids = [int(x) for x in ids.split(",") if x.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids ต้องเป็นตัวเลขคั่นด้วย comma")
+
+    if not game_ids:
+        raise HTTPException(status_code=400, detail="ต้องระบุ ids อย่างน้อย 1 รายการ")
+    if len(game_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"ระบุ ids ได้ไม่เกิน {MAX_BATCH_IDS} รายการ")
+
+    return crud_game.get_games_by_ids(db, game_ids)
+
+
 @router.get("/{game_id}", response_model=GameResponse)
-def get_game_by_id(game_id: int, db: Session = Depends(get_db)):
-    return crud_game.get_game(db, game_id)
+def get_game_by_id(game_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    game = crud_game.get_game(db, game_id)
+    return _conditional(request, response, game)
 
 
 @router.put("/{game_id}")
@@ -111,21 +248,75 @@ def update_game_info(
         raise
 
 
+def _delete_game_job(game_id: int, chunk_size: int | None) -> dict:
+    db = SessionLocal()
+    try:
+        return crud_game.delete_game_and_dependencies(db, game_id, chunk_size=chunk_size)
+    finally:
+        db.close()
+
+
 @router.delete("/{game_id}")
-def delete_game(game_id: int, db: Session = Depends(get_db)):
-    return crud_game.delete_game_and_dependencies(db, game_id)
+def delete_game(
+    game_id: int,
+    mode: Literal["sync", "async"] = Query("sync", description="async: คืน job_id ทันทีแล้วลบเบื้องหลัง"),
+    chunked: bool = Query(False, description="ลบทีละชุดของ orders และ commit ทีละชุด"),
+    db: Session = Depends(get_db),
+):
+    chunk_size = settings.DELETE_GAME_CHUNK if chunked else None
+    if mode == "sync":
+        return crud_game.delete_game_and_dependencies(db, game_id, chunk_size=chunk_size)
+
+    crud_game.get_game(db, game_id)
+    job = jobs.submit("delete_game", _delete_game_job, game_id, chunk_size)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"job_id": job["id"], "status": job["status"], "status_url": f"/games/jobs/{job['id']}"},
+    )
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """
+    สถานะงานเบื้องหลัง (เช่น DELETE /games/{id}?mode=async)
+    สถานะเก็บใน memory ของ worker ที่รับงาน: ถ้ารันหลาย worker request ที่ไปถึง worker อื่นจะได้ 404
+    """
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="ไม่พบงานนี้")
+    return job
 
 
 @router.get("/user/{user_id}/purchased-games", response_model=List[GameResponse])
 def get_purchased_games(user_id: int, db: Session = Depends(get_db)):
     return crud_game.get_purchased_games_by_user(db, user_id)
 
+@router.get("/user/{user_id}/library", response_model=GamePage)
+def get_library_page(
+    user_id: int,
+    limit: int = Query(20, ge=1, le=100, description="จำนวนเกมต่อหน้า"),
+    after: int | None = Query(None, description="next_cursor จากหน้าก่อนหน้า"),
+    sort: Literal["recent", "name"] = Query("recent", description="recent: ซื้อล่าสุดก่อน, name: เรียงตามชื่อ"),
+    db: Session = Depends(get_db),
+):
+    return crud_game.get_user_library_page(db, user_id, limit=limit, after=after, sort=sort)
+
+
+@router.get("/cache/stats")
+def catalog_cache_stats():
+    return {"catalog": catalog_cache.stats(), "library": library_cache.stats()}
+
+
 @router.get("/stats/top-selling")
-def top_selling_games_daily(
+async def top_selling_games_daily(
     days: int = Query(7, ge=1, le=90, description="จำนวนวันย้อนหลัง (รวมวันนี้)"),
     top: int = Query(5, ge=1, le=20, description="จำนวนอันดับต่อวัน"),
     order_by: Literal["units", "revenue"] = Query("units", description="จัดอันดับภายในวัน: units หรือ revenue"),
-    db: Session = Depends(get_db),
 ):
-    return crud_game.get_daily_top_selling_games(db, days=days, top_n=top, order_by=order_by)
+    return await top_selling_cache.get((days, top, order_by))
+
+
+@router.get("/stats/top-selling/cache")
+def top_selling_cache_stats():
+    return top_selling_cache.stats()
 
@@ -1,13 +1,19 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, UploadFile, status, Depends, File, Form, Path
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from app.schemas.user import MoneyUpdate, UserCreate, UserResponse, UserUpdate
 from app.crud import user as crud_user
 from app.db.dependency import get_db
+from app.services import upload_service
+from app.services.license_index import license_index
 from typing import List
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+MAX_OWNS_IDS = 1000
+
 @router.get("/", response_model=List[UserResponse])
 def read_users(db: Session = Depends(get_db)):
     return crud_user.get_users(db)
@@ -30,7 +36,16 @@ async def create_user_with_image(
         img_url=""
     )
 
-    created = crud_user.create_user_with_file(db, user_in, image) 
+    # อัปโหลดรูปใน thread pool พร้อมกับเช็คอีเมลซ้ำใน DB แล้วค่อย insert เมื่อได้ URL
+    upload = asyncio.create_task(upload_service.upload_avatar_async(image))
+    try:
+        await run_in_threadpool(crud_user.ensure_email_available, db, email)
+    except BaseException:
+        upload.cancel()
+        raise
+
+    img_url = await upload
+    created = await run_in_threadpool(crud_user.create_user, db, user_in, img_url)
     if not created:
         raise HTTPException(status_code=400, detail="Create user failed")
     return {"message": "Create updated successfully"}
@@ -78,4 +93,21 @@ def change_password(
     result = crud_user.update_password(db, user_id, current_password, new_password)
     if not result:
         raise HTTPException(status_code=400, detail="Password update failed")
-    return {"message": "Password updated successfully"}
\ No newline at end of file
+    return {"message": "Password updated successfully"}
+
+
+@router.post("/{user_id}/owns")
+def check_owned_games(
+    user_id: int = Path(..., gt=0),
+    game_ids: List[int] = Form(...),
+    db: Session = Depends(get_db)
+):
+    if len(game_ids) > MAX_OWNS_IDS:
+        raise HTTPException(status_code=400, detail=f"ระบุ game_ids ได้ไม่เกิน {MAX_OWNS_IDS} รายการ")
+
+    flags = license_index.owned(db, user_id, game_ids)
+    return {
+        "user_id": user_id,
+        "owned": [gid for gid, own in zip(game_ids, flags) if own],
+        "bitmap": "".join("1" if own else "0" for own in flags),
+    }
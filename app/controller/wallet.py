@@ -1,88 +1,116 @@
 from typing import Literal, Optional
-from fastapi import APIRouter, Depends, Form, HTTPException, Path
+from fastapi import APIRouter, Depends, Form, Header, HTTPException, Path, Response
 from sqlalchemy.orm import Session
+from app.core.auth import get_current_user, require_account_owner, require_admin
 from app.db.dependency import get_db
 from app.schemas.user import MoneyUpdate
 from app.crud import wallet as crud_wallet
+from app.services.idempotency_service import run_idempotent
 
 router = APIRouter(prefix="/wallet", tags=["Users"])
 
 
-@router.get("/read/{user_id}")
+@router.get("/read/{user_id}", dependencies=[Depends(require_account_owner)])
 def get_balance(
     user_id: int = Path(..., gt=0),
     db: Session = Depends(get_db)
 ):
     return crud_wallet.get_balance(db, user_id)
 
-@router.post("/topup/{user_id}", response_model=MoneyUpdate)
+@router.post("/topup/{user_id}", response_model=MoneyUpdate, dependencies=[Depends(require_account_owner)])
 def add_balance(
+    response: Response,
     user_id: int = Path(..., gt=0),
     amount: float = Form(...),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db)
 ):
-    result = crud_wallet.add_balance(db, user_id, amount)
-    return result
+    return run_idempotent(
+        db, response, user_id, idempotency_key,
+        endpoint="topup",
+        params={"amount": amount},
+        fn=lambda before_commit: crud_wallet.add_balance(db, user_id, amount, before_commit=before_commit),
+    )
 
 
-@router.post("/buy/{user_id}/{game_id}")
+@router.post("/buy/{user_id}/{game_id}", dependencies=[Depends(require_account_owner)])
 def buy_one(
+    response: Response,
     user_id: int,
     game_id: int,
     discount_code: str | None = Form(None), 
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
 ):
-    discount_code_id = None
-    if discount_code:
-        code = crud_wallet.get_discount_code_by_codeva(db, discount_code)
-
-        if not code:
-            raise HTTPException(status_code=404, detail="ไม่พบโค้ดส่วนลดนี้หรือโค้ดไม่พร้อมใช้งาน")
-        
-        discount_code_id = code["id"]
-
-    result = crud_wallet.purchase_one_game(
-        db=db,
-        user_id=user_id,
-        game_id=game_id,
-        discount_code_id=discount_code_id
+    def purchase(before_commit):
+        discount_code_id = None
+        if discount_code:
+            code = crud_wallet.get_discount_code_by_codeva(db, discount_code)
+
+            if not code:
+                raise HTTPException(status_code=404, detail="ไม่พบโค้ดส่วนลดนี้หรือโค้ดไม่พร้อมใช้งาน")
+            
+            discount_code_id = code["id"]
+
+        return crud_wallet.purchase_one_game(
+            db=db,
+            user_id=user_id,
+            game_id=game_id,
+            discount_code_id=discount_code_id,
+            before_commit=before_commit,
+        )
+
+    return run_idempotent(
+        db, response, user_id, idempotency_key,
+        endpoint="buy",
+        params={"game_ids": [game_id], "discount_code": discount_code},
+        fn=purchase,
+        render=lambda result: {"message": "คุณซื้อเกมสำเร็จ!"},
     )
 
-    return {"message": "คุณซื้อเกมสำเร็จ!"}
 
-
-@router.post("/buy/{user_id}")
+@router.post("/buy/{user_id}", dependencies=[Depends(require_account_owner)])
 def buy_many(
+    response: Response,
     user_id: int,
     game_ids: list[int] = Form(...), 
     discount_code: str | None = Form(None),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
 ):
-    discount_code_id = None
-    if discount_code:
-        code = crud_wallet.get_discount_code_by_codeva(db, discount_code)
-
-        if not code:
-            raise HTTPException(status_code=404, detail="ไม่พบโค้ดส่วนลดนี้หรือโค้ดไม่พร้อมใช้งาน")
-        
-        discount_code_id = code["id"]
-
-    result = crud_wallet.purchase_games(
-        db=db,
-        user_id=user_id,
-        game_ids=game_ids,
-        discount_code_id=discount_code_id
+    def purchase(before_commit):
+        discount_code_id = None
+        if discount_code:
+            code = crud_wallet.get_discount_code_by_codeva(db, discount_code)
+
+            if not code:
+                raise HTTPException(status_code=404, detail="ไม่พบโค้ดส่วนลดนี้หรือโค้ดไม่พร้อมใช้งาน")
+            
+            discount_code_id = code["id"]
+
+        return crud_wallet.purchase_games(
+            db=db,
+            user_id=user_id,
+            game_ids=game_ids,
+            discount_code_id=discount_code_id,
+            before_commit=before_commit,
+        )
+
+    return run_idempotent(
+        db, response, user_id, idempotency_key,
+        endpoint="buy",
+        params={"game_ids": sorted(set(game_ids)), "discount_code": discount_code},
+        fn=purchase,
+        render=lambda result: {"message": "คุณซื้อเกมสำเร็จ!"},
     )
 
-    return {"message": "คุณซื้อเกมสำเร็จ!"}
-
 
-@router.get("/transaction/{user_id}")
+@router.get("/transaction/{user_id}", dependencies=[Depends(require_account_owner)])
 def my_transactions(user_id: int, db: Session = Depends(get_db)):
     return crud_wallet.get_user_transactions(db, user_id)
 
 
-@router.post("/discount")
+@router.post("/discount", dependencies=[Depends(require_admin)])
 def create_discount_form(
     code: Optional[str] = Form(None),               
     type: str = Form("percent"),
@@ -105,7 +133,7 @@ def create_discount_form(
     return result
 
 
-@router.put("/discount/{code_id}")
+@router.put("/discount/{code_id}", dependencies=[Depends(require_admin)])
 def update_discount(
     code_id: int,
     type: Optional[Literal["percent", "fixed"]] = Form(None),
@@ -129,26 +157,26 @@ def update_discount(
     return result
 
 
-@router.get("/discount/all")
+@router.get("/discount/all", dependencies=[Depends(require_admin)])
 def read_all_discounts(db: Session = Depends(get_db)):
     return crud_wallet.get_all_discount_codes(db)
 
 
-@router.get("/discount/allwithusage")
+@router.get("/discount/allwithusage", dependencies=[Depends(require_admin)])
 def read_all_discounts(db: Session = Depends(get_db)):
     return crud_wallet.get_all_discount_codes_with_usage(db)
 
 
-@router.delete("/discount/{code_id}")
+@router.delete("/discount/{code_id}", dependencies=[Depends(require_admin)])
 def delete_code(code_id: int, db: Session = Depends(get_db)):
     return crud_wallet.delete_discount_code(db, code_id)
 
 
-@router.get("/discount/search/")
+@router.get("/discount/search/", dependencies=[Depends(get_current_user)])
 def read_discount_by_code(code: str, db: Session = Depends(get_db)):
     return crud_wallet.get_discount_code_by_codeva(db, code)
 
 
-@router.get("/discount/{code_id}")
+@router.get("/discount/{code_id}", dependencies=[Depends(require_admin)])
 def read_discount_by_id(code_id: int, db: Session = Depends(get_db)):
     return crud_wallet.get_discount_code(db, code_id)
\ No newline at end of file
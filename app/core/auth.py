@@ -0,0 +1,30 @@
+from fastapi import Depends, HTTPException, Path
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.core.tokens import TokenData, credentials_error, decode_access_token
+
+ADMIN_ROLE = "ADMIN"
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def get_current_user(credentials: HTTPAuthorizationCredentials | None = Depends(_bearer)) -> TokenData:
+    if credentials is None:
+        raise credentials_error("Not authenticated")
+    return decode_access_token(credentials.credentials)
+
+
+def require_admin(current: TokenData = Depends(get_current_user)) -> TokenData:
+    if current.role != ADMIN_ROLE:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return current
+
+
+def require_account_owner(
+    user_id: int = Path(..., gt=0),
+    current: TokenData = Depends(get_current_user),
+) -> TokenData:
+    # route ที่มี {user_id}: ต้องเป็นเจ้าของบัญชีนั้น (หรือ admin)
+    if current.user_id != user_id and current.role != ADMIN_ROLE:
+        raise HTTPException(status_code=403, detail="Not allowed for this account")
+    return current
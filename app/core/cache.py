@@ -0,0 +1,144 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Hashable
+
+from app.core.config import settings
+
+_MISSING = object()
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    return str(obj)
+
+
+class TTLCache:
+    """LRU + TTL cache แบบ thread-safe สำหรับข้อมูลที่อ่านบ่อยแต่เปลี่ยนน้อย
+
+    ทุกครั้งที่ invalidate() จะเพิ่ม version และล้างข้อมูลทั้งหมด
+    ค่าที่โหลดมาก่อนการ invalidate จะไม่ถูกเก็บลง cache (กันข้อมูลเก่าย้อนกลับมา)
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        # id(value) -> (value, hash) เฉพาะค่าที่ยังอยู่ใน _data: ลบตามเมื่อ entry ถูกลบ/หมดอายุ/ถูกแทนที่
+        self._fingerprints: dict[int, tuple[Any, str]] = {}
+        self._refs: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[key]
+                    self._release(entry[1])
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, version: int | None = None) -> None:
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            old = self._data.get(key)
+            if old is not None:
+                self._release(old[1])
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._refs[id(value)] = self._refs.get(id(value), 0) + 1
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._release(evicted)
+                self.evictions += 1
+
+    def _release(self, value: Any) -> None:
+        # เรียกขณะถือ lock: ค่านี้ออกจาก _data ไปหนึ่ง entry
+        count = self._refs.get(id(value), 0) - 1
+        if count > 0:
+            self._refs[id(value)] = count
+        else:
+            self._refs.pop(id(value), None)
+            self._fingerprints.pop(id(value), None)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        version = self.version
+        value = loader()
+        self.set(key, value, version=version)
+        return value
+
+    def pop(self, key: Hashable) -> None:
+        # เพิ่ม version ด้วย เพื่อไม่ให้ค่าที่กำลังโหลดอยู่ (ข้อมูลก่อนแก้ไข) ถูกเขียนกลับมา
+        with self._lock:
+            self.version += 1
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._release(entry[1])
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._data.clear()
+            self._refs.clear()
+            self._fingerprints.clear()
+
+    def fingerprint(self, value: Any) -> str:
+        """hash ของเนื้อหา ใช้เป็น ETag: เหมือนกันทุก worker ถ้าข้อมูลเหมือนกัน และเปลี่ยนทุกครั้งที่โหลดได้ข้อมูลใหม่
+
+        ค่าที่ได้จาก cache เป็น object เดิมจนกว่าจะโหลดใหม่ จึงจำ hash ตาม identity ไว้ (คำนวณครั้งเดียวต่อการโหลด)
+        จำไว้เฉพาะค่าที่ยังอยู่ใน cache เท่านั้น จึงไม่ถือ payload เก่าไว้หลัง invalidate/หมดอายุ
+        """
+        with self._lock:
+            entry = self._fingerprints.get(id(value))
+            if entry is not None and entry[0] is value:
+                return entry[1]
+
+        raw = json.dumps(value, sort_keys=True, default=_json_default, ensure_ascii=False)
+        digest = hashlib.sha256(raw.encode()).hexdigest()[:32]
+        with self._lock:
+            if id(value) in self._refs:
+                self._fingerprints[id(value)] = (value, digest)
+        return digest
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "version": self.version,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+catalog_cache = TTLCache(
+    maxsize=settings.CATALOG_CACHE_SIZE,
+    ttl=settings.CATALOG_CACHE_TTL,
+)
+
+library_cache = TTLCache(
+    maxsize=settings.LIBRARY_CACHE_USERS,
+    ttl=settings.LIBRARY_CACHE_TTL,
+)
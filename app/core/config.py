@@ -1,4 +1,7 @@
 # app/core/config.py
+import secrets
+from typing import Literal
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -19,9 +22,79 @@ class Settings(BaseSettings):
         )
 
 
+    # ใช้เซ็น access token: ต้องตั้งใน .env เมื่อ DEBUG=false (ถ้าไม่ตั้ง แอปจะไม่ start)
+    # ตอน DEBUG ถ้าไม่ตั้งจะสุ่มต่อ process: token ใช้ข้าม worker / ข้ามการ restart ไม่ได้
+    SECRET_KEY: str | None = None
+    ACCESS_TOKEN_TTL: int = 900
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: int = 60
+    # jti ที่ logout แล้ว: memory = ต่อ process (ดู RevocationStore ใน app/core/tokens.py)
+    TOKEN_REVOCATION_BACKEND: Literal["memory"] = "memory"
+
+    # login ผิดเกินจำนวนใน window (วินาที) -> บล็อก LOGIN_LOCKOUT_BASE * 2^n วินาที (ไม่เกิน LOGIN_LOCKOUT_MAX)
+    LOGIN_THROTTLE_BACKEND: Literal["memory"] = "memory"
+    LOGIN_THROTTLE_WINDOW: int = 300
+    LOGIN_MAX_FAILS_PER_EMAIL: int = 5
+    LOGIN_MAX_FAILS_PER_IP: int = 20
+    LOGIN_LOCKOUT_BASE: int = 30
+    LOGIN_LOCKOUT_MAX: int = 3600
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000
+
+    # Argon2 รันใน process pool: จำนวน process และจำนวนงานที่รอคิวได้ก่อนตอบ 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE: int = 16
+    # ค่า cost ของ Argon2 (ค่าเริ่มต้น = ค่าเดิมของ passlib) ปรับด้วย python -m app.scripts.calibrate_argon2
+    # hash เดิมที่ cost ไม่ตรงจะถูก hash ใหม่อัตโนมัติตอน login สำเร็จ
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+
     SUPABASE_URL: str | None = None
     SUPABASE_ANON_KEY: str | None = None
 
+    # supabase | local | memory
+    STORAGE_BACKEND: Literal["supabase", "local", "memory"] = "supabase"
+    STORAGE_BUCKET: str = "image_user"
+    LOCAL_STORAGE_DIR: str = "uploads"
+    LOCAL_STORAGE_URL: str = "/uploads"
+    STORAGE_GC_GRACE_HOURS: int = 48
+    STORAGE_GC_BATCH: int = 100
+
+    UPLOAD_WORKERS: int = 8
+    MAX_UPLOAD_BYTES: int = 5 * 1024 * 1024
+
+    CATALOG_CACHE_SIZE: int = 2048
+    CATALOG_CACHE_TTL: int = 300
+    CATALOG_HTTP_MAX_AGE: int = 60
+
+    LIBRARY_CACHE_USERS: int = 10000
+    LIBRARY_CACHE_TTL: int = 600
+    LICENSE_INDEX_USERS: int = 50000
+
+    IMPORT_UPLOAD_WORKERS: int = 8
+    IMPORT_INSERT_CHUNK: int = 500
+    # ขนาดรวมสูงสุดของรูปใน zip หลังแตกไฟล์ (รูปละไม่เกิน MAX_UPLOAD_BYTES)
+    IMPORT_ARCHIVE_MAX_BYTES: int = 200 * 1024 * 1024
+
+    JOB_WORKERS: int = 2
+    DELETE_GAME_CHUNK: int = 500
+
+    # เก็บผลลัพธ์ของ Idempotency-Key ไว้กี่วินาที / cache ใน memory กี่ key
+    IDEMPOTENCY_TTL: int = 24 * 3600
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    # pending นานกว่านี้ = request แรกตายก่อน commit (ผลลัพธ์ commit พร้อมยอดเงินเสมอ) ให้ retry รับช่วงได้
+    IDEMPOTENCY_PENDING_TIMEOUT: int = 120
+
+    LEADERBOARD_TTL: int = 60
+    LEADERBOARD_REFRESH_SECONDS: int = 60
+
+    @model_validator(mode="after")
+    def _require_secret_key(self):
+        if not self.SECRET_KEY:
+            if not self.DEBUG:
+                raise ValueError("SECRET_KEY must be set when DEBUG is false")
+            self.SECRET_KEY = secrets.token_urlsafe(32)
+        return self
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,12 +1,105 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException
 from passlib.context import CryptContext
 
+from app.core.config import settings
+
 pwd_context = CryptContext(
     schemes=["argon2"],
     deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
 )
 
-def hash_password(password: str) -> str:
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """รัน Argon2 ใน process pool แยก ไม่ให้กิน worker thread / GIL ของ request อื่น
+
+    รับงานพร้อมกันได้ไม่เกิน workers + queue_limit งาน เกินนั้นตอบ 503 ทันที
+    (ดีกว่าให้ request ต่อคิวจน timeout และจอง thread ไว้ทั้งหมด)
+    workers=0 = hash ใน thread ที่เรียกเลย (ใช้กับสคริปต์/CLI)
+    """
+
+    def __init__(self, workers: int, queue_limit: int, retry_after: int = 1):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max(1, workers + queue_limit))
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: ไม่ fork process ที่มี thread ของ server อยู่แล้ว
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, please retry",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        try:
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._run(_verify, plain_password, hashed_password)
+
+    def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return self._run(_verify_and_update, plain_password, hashed_password)
+
+    def start(self) -> None:
+        # สร้าง worker process ล่วงหน้า เพื่อไม่ให้ login แรกต้องรอ spawn
+        if self.workers > 0:
+            pool = self._executor()
+            for f in [pool.submit(_hash, "warmup") for _ in range(self.workers)]:
+                f.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE)
+
+
+def hash_password(password: str) -> str:
+    return password_hasher.hash(password)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return password_hasher.verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    # (ถูกต้องหรือไม่, hash ใหม่ถ้า hash เดิมใช้ cost เก่า)
+    return password_hasher.verify_and_update(plain_password, hashed_password)
@@ -0,0 +1,176 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator
+
+from app.core.config import settings
+
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int | None = None
+    updated_at: datetime | None = None
+
+
+class StorageBackend(ABC):
+    """ที่เก็บไฟล์รูป เลือก implementation ผ่าน settings.STORAGE_BACKEND"""
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, content_type: str) -> None: ...
+
+    @abstractmethod
+    def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def public_url(self, key: str) -> str: ...
+
+    @abstractmethod
+    def list_objects(self, prefix: str) -> Iterator[StoredObject]: ...
+
+    @abstractmethod
+    def delete(self, keys: list[str]) -> None: ...
+
+    def key_from_url(self, url: str | None) -> str | None:
+        base = self.public_url("")
+        if not url or not url.startswith(base.split("?", 1)[0]):
+            return None
+        return url[len(base.split("?", 1)[0]):].split("?", 1)[0] or None
+
+
+class SupabaseStorage(StorageBackend):
+    PAGE_SIZE = 1000
+
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+
+    def _bucket(self):
+        from app.core.supabase_client import get_supabase
+
+        return get_supabase().storage.from_(self.bucket)
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        from storage3.exceptions import StorageApiError
+
+        try:
+            self._bucket().upload(key, data, file_options={"content-type": content_type})
+        except StorageApiError as e:
+            # มีไฟล์ key นี้อยู่แล้ว (อัปโหลดพร้อมกัน) ถือว่าสำเร็จ
+            if str(e.status) != "409":
+                raise
+
+    def exists(self, key: str) -> bool:
+        return self._bucket().exists(key)
+
+    def public_url(self, key: str) -> str:
+        return self._bucket().get_public_url(key)
+
+    def list_objects(self, prefix: str) -> Iterator[StoredObject]:
+        prefix = prefix.strip("/")
+        offset = 0
+        while True:
+            entries = self._bucket().list(prefix, {"limit": self.PAGE_SIZE, "offset": offset})
+            for entry in entries:
+                key = f"{prefix}/{entry['name']}" if prefix else entry["name"]
+                if entry.get("id") is None:
+                    yield from self.list_objects(key)
+                    continue
+                meta = entry.get("metadata") or {}
+                stamp = entry.get("updated_at") or entry.get("created_at")
+                yield StoredObject(
+                    key=key,
+                    size=meta.get("size"),
+                    updated_at=datetime.fromisoformat(stamp.replace("Z", "+00:00")) if stamp else None,
+                )
+            if len(entries) < self.PAGE_SIZE:
+                return
+            offset += self.PAGE_SIZE
+
+    def delete(self, keys: list[str]) -> None:
+        if keys:
+            self._bucket().remove(keys)
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str, base_url: str):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"invalid storage key: {key}")
+        return path
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def public_url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def list_objects(self, prefix: str) -> Iterator[StoredObject]:
+        base = self.root / prefix.strip("/")
+        if not base.is_dir():
+            return
+        for path in base.rglob("*"):
+            if path.is_file() and not path.name.startswith("."):
+                st = path.stat()
+                yield StoredObject(
+                    key=path.relative_to(self.root).as_posix(),
+                    size=st.st_size,
+                    updated_at=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+                )
+
+    def delete(self, keys: list[str]) -> None:
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+
+class MemoryStorage(StorageBackend):
+    def __init__(self, base_url: str = "/memory"):
+        self.base_url = base_url.rstrip("/")
+        self._objects: dict[str, tuple[bytes, str, datetime]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        with self._lock:
+            self._objects[key] = (data, content_type, datetime.now(timezone.utc))
+
+    def exists(self, key: str) -> bool:
+        return key in self._objects
+
+    def public_url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def list_objects(self, prefix: str) -> Iterator[StoredObject]:
+        prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        with self._lock:
+            items = [(k, v) for k, v in self._objects.items() if k.startswith(prefix)]
+        for key, (data, _, updated_at) in items:
+            yield StoredObject(key=key, size=len(data), updated_at=updated_at)
+
+    def delete(self, keys: list[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._objects.pop(key, None)
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> StorageBackend:
+    backend = settings.STORAGE_BACKEND
+    if backend == "local":
+        return LocalStorage(settings.LOCAL_STORAGE_DIR, settings.LOCAL_STORAGE_URL)
+    if backend == "memory":
+        return MemoryStorage()
+    return SupabaseStorage(settings.STORAGE_BUCKET)
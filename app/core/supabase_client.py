@@ -1,4 +1,12 @@
+from functools import lru_cache
+
 from supabase import create_client, Client
 from app.core.config import settings
 
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+
+@lru_cache(maxsize=1)
+def get_supabase() -> Client:
+    # สร้างเมื่อใช้งานครั้งแรก: import โมดูลนี้ได้แม้ไม่มี credentials (เช่นตอนใช้ local storage)
+    if not settings.SUPABASE_URL or not settings.SUPABASE_ANON_KEY:
+        raise RuntimeError("SUPABASE_URL / SUPABASE_ANON_KEY ยังไม่ได้ตั้งค่า")
+    return create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
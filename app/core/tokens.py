@@ -0,0 +1,123 @@
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from fastapi import HTTPException
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class TokenData:
+    user_id: int
+    role: str
+    jti: str
+    exp: int
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(settings.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).digest())
+
+
+def credentials_error(detail: str) -> HTTPException:
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+# token ที่ตรวจลายเซ็นแล้ว: ครั้งถัดไปแค่ lookup (ไม่ต้องคำนวณ HMAC / parse JSON ซ้ำ)
+_verified = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+
+
+class RevocationStore(ABC):
+    """ที่เก็บ jti ที่ถูก logout
+
+    memory = ต่อ process: worker อื่นยังรับ token นั้นได้จนหมดอายุ (ไม่เกิน ACCESS_TOKEN_TTL)
+    ถ้าต้องการเพิกถอนทุก worker ให้ implement interface นี้บน store กลาง (เช่น Redis)
+    แล้วเลือกผ่าน TOKEN_REVOCATION_BACKEND
+    """
+
+    @abstractmethod
+    def revoke(self, jti: str, exp: int) -> None: ...
+
+    @abstractmethod
+    def is_revoked(self, jti: str) -> bool: ...
+
+    @abstractmethod
+    def stats(self) -> dict: ...
+
+
+class MemoryRevocationStore(RevocationStore):
+    def __init__(self):
+        # jti -> เวลาหมดอายุของ token (เก็บแค่จนกว่า token จะหมดอายุเอง)
+        self._revoked: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, exp: int) -> None:
+        now = time.time()
+        with self._lock:
+            for old in [j for j, e in self._revoked.items() if e <= now]:
+                del self._revoked[old]
+            self._revoked[jti] = exp
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "revoked": len(self._revoked)}
+
+
+def _make_revocation_store() -> RevocationStore:
+    if settings.TOKEN_REVOCATION_BACKEND != "memory":
+        raise RuntimeError(f"unknown TOKEN_REVOCATION_BACKEND: {settings.TOKEN_REVOCATION_BACKEND}")
+    return MemoryRevocationStore()
+
+
+revocations = _make_revocation_store()
+
+
+def create_access_token(user_id: int, role: str) -> tuple[str, int]:
+    exp = int(time.time()) + settings.ACCESS_TOKEN_TTL
+    claims = {"sub": user_id, "role": role, "jti": secrets.token_urlsafe(12), "exp": exp}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}", settings.ACCESS_TOKEN_TTL
+
+
+def decode_access_token(token: str) -> TokenData:
+    data = _verified.get(token)
+    if data is None:
+        payload, _, signature = token.partition(".")
+        if not signature or not hmac.compare_digest(signature, _sign(payload)):
+            raise credentials_error("Invalid token")
+        try:
+            claims = json.loads(_b64decode(payload))
+            data = TokenData(user_id=int(claims["sub"]), role=str(claims["role"]), jti=str(claims["jti"]), exp=int(claims["exp"]))
+        except (ValueError, KeyError, TypeError):
+            raise credentials_error("Invalid token")
+        _verified.set(token, data)
+
+    if data.exp <= time.time():
+        _verified.pop(token)
+        raise credentials_error("Token expired")
+    if revocations.is_revoked(data.jti):
+        raise credentials_error("Token revoked")
+    return data
+
+
+def revoke_token(data: TokenData) -> None:
+    revocations.revoke(data.jti, data.exp)
+
+
+def token_stats() -> dict:
+    return {"verified_cache": _verified.stats(), "revocations": revocations.stats()}
@@ -1,12 +1,23 @@
-from typing import Dict, List, Literal
+from typing import Dict, Iterator, List, Literal
 from sqlalchemy import text
-from datetime import datetime
+from datetime import date, datetime
 from fastapi import HTTPException, UploadFile
 from sqlalchemy.orm import Session
-from app.services.upload_service import upload_game_image
+from app.core.cache import catalog_cache, library_cache
+from app.core.config import settings
+from app.services.license_index import license_index
+from app.services.search_service import GameSearchIndex
+from app.services.upload_service import read_file_chunks, upload_game_image
 from app.utils.function import thai_date
 
-def get_game_all(db: Session) -> dict | None:
+game_search_index = GameSearchIndex(max_age=settings.CATALOG_CACHE_TTL)
+_NOT_CACHED = object()
+
+def get_game_all(db: Session) -> list[dict]:
+    return catalog_cache.get_or_load(("all",), lambda: _fetch_game_all(db))
+
+
+def _fetch_game_all(db: Session) -> list[dict]:
     sql = text("""
         SELECT 
             g.id, g.name, c.name AS category_name,
@@ -17,25 +28,190 @@ def get_game_all(db: Session) -> dict | None:
     """)
 
     rows = db.execute(sql).mappings().all()
-    return rows
+    return [dict(r) for r in rows]
 
 
-def get_game_by_name(db: Session, keyword: str) -> list[dict] | None:
-    sql = text("""
+def iter_game_chunks(db: Session, chunk_size: int = 1000) -> Iterator[list[dict]]:
+    # server-side cursor: MySQL ส่งแถวมาทีละ chunk ไม่โหลดทั้งตารางเข้าหน่วยความจำ
+    result = db.execute(
+        text("""
+            SELECT 
+                g.id, g.name, g.category_id, c.name AS category_name,
+                g.description, g.price, g.release_date, g.image_url
+            FROM games AS g
+            JOIN game_category AS c ON g.category_id = c.id
+            ORDER BY g.id
+        """),
+        execution_options={"stream_results": True, "yield_per": chunk_size},
+    )
+
+    for chunk in result.mappings().partitions():
+        yield [dict(r) for r in chunk]
+
+
+def get_game_page(
+    db: Session,
+    limit: int = 20,
+    after: int | None = None,
+    category_id: int | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+) -> dict:
+    key = ("page", limit, after, category_id, min_price, max_price)
+    return catalog_cache.get_or_load(
+        key,
+        lambda: _fetch_game_page(db, limit, after, category_id, min_price, max_price),
+    )
+
+
+def _fetch_game_page(
+    db: Session,
+    limit: int,
+    after: int | None,
+    category_id: int | None,
+    min_price: float | None,
+    max_price: float | None,
+) -> dict:
+    # keyset บน g.id: อ่านทีละช่วงตาม primary key แทนการดึงทั้งตาราง
+    where = ["g.id > :after"]
+    params = {"after": after or 0, "limit": limit + 1}
+
+    if category_id is not None:
+        where.append("g.category_id = :category_id")
+        params["category_id"] = category_id
+    if min_price is not None:
+        where.append("g.price >= :min_price")
+        params["min_price"] = min_price
+    if max_price is not None:
+        where.append("g.price <= :max_price")
+        params["max_price"] = max_price
+
+    sql = text(f"""
         SELECT 
             g.id, g.name, c.name AS category_name,
             g.description, g.price, g.release_date, g.image_url
         FROM games AS g
         JOIN game_category AS c ON g.category_id = c.id
-        WHERE g.name LIKE :keyword
+        WHERE {" AND ".join(where)}
         ORDER BY g.id
+        LIMIT :limit
     """)
 
-    rows = db.execute(sql, {"keyword": f"%{keyword.lower()}%"}).mappings().all()
-    return rows
+    rows = db.execute(sql, params).mappings().all()
+    items = [dict(r) for r in rows[:limit]]
+    next_cursor = items[-1]["id"] if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+BROWSE_SORTS = {
+    "name": lambda g: ((g["name"] or "").casefold(), g["id"]),
+    "price_asc": lambda g: (float(g["price"]), g["id"]),
+    "price_desc": lambda g: (-float(g["price"]), g["id"]),
+    "popularity": lambda g: (-g["popularity"], g["id"]),
+}
+
+
+def _parse_thai_date(value: str | None) -> date | None:
+    # release_date เก็บเป็น dd/mm/yyyy (พ.ศ.) จาก thai_date()
+    try:
+        d, m, y = (int(x) for x in (value or "").split("/"))
+        return date(y - 543, m, d)
+    except ValueError:
+        return None
+
+
+def _fetch_browse_catalog(db: Session) -> dict:
+    rows = db.execute(text("""
+        SELECT 
+            g.id, g.name, g.category_id, c.name AS category_name,
+            g.description, g.price, g.release_date, g.image_url,
+            COALESCE(p.units, 0) AS popularity
+        FROM games AS g
+        JOIN game_category AS c ON g.category_id = c.id
+        LEFT JOIN (
+            SELECT game_id, SUM(units) AS units
+            FROM daily_game_sales
+            WHERE sale_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+            GROUP BY game_id
+        ) AS p ON p.game_id = g.id
+    """)).mappings().all()
+
+    games = []
+    for r in rows:
+        g = dict(r)
+        g["popularity"] = int(g["popularity"] or 0)
+        g["released_on"] = _parse_thai_date(g["release_date"])
+        games.append(g)
+
+    # เรียงไว้ล่วงหน้าทุกแบบ การกรองภายหลังจะคงลำดับไว้ ไม่ต้อง sort ใหม่ทุก request
+    return {name: sorted(games, key=key) for name, key in BROWSE_SORTS.items()}
+
+
+def browse_games(
+    db: Session,
+    category_id: int | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    released_from: date | None = None,
+    released_to: date | None = None,
+    sort: Literal["name", "price_asc", "price_desc", "popularity"] = "name",
+    limit: int = 20,
+    offset: int = 0,
+) -> dict:
+    catalog = catalog_cache.get_or_load(("browse",), lambda: _fetch_browse_catalog(db))
+
+    def matches(g: dict) -> bool:
+        price = float(g["price"])
+        if min_price is not None and price < min_price:
+            return False
+        if max_price is not None and price > max_price:
+            return False
+        if released_from is not None and (g["released_on"] is None or g["released_on"] < released_from):
+            return False
+        if released_to is not None and (g["released_on"] is None or g["released_on"] > released_to):
+            return False
+        return True
+
+    # facet นับตามเงื่อนไขอื่นทั้งหมดยกเว้นประเภท เพื่อให้เห็นจำนวนของประเภทอื่นด้วย
+    facets: Dict[int, dict] = {}
+    items = []
+    for g in catalog[sort]:
+        if not matches(g):
+            continue
+        facet = facets.setdefault(g["category_id"], {
+            "category_id": g["category_id"],
+            "category_name": g["category_name"],
+            "count": 0,
+        })
+        facet["count"] += 1
+        if category_id is None or g["category_id"] == category_id:
+            items.append(g)
+
+    return {
+        "total": len(items),
+        "items": items[offset:offset + limit],
+        "facets": sorted(facets.values(), key=lambda f: f["category_id"]),
+    }
+
+
+def get_game_by_name(db: Session, keyword: str, limit: int = 20) -> list[dict]:
+    version = catalog_cache.version
+    if not game_search_index.is_fresh(version):
+        game_search_index.build(get_game_all(db), version)
+
+    return game_search_index.search(keyword, limit=limit)
 
 
 def get_game(db: Session, game_id: int) -> dict | None:
+    result = catalog_cache.get_or_load(("game", game_id), lambda: _fetch_game(db, game_id))
+
+    if not result:
+        raise HTTPException(status_code=404, detail="ไม่พบข้อมูลเกมนี้")
+
+    return result
+
+
+def _fetch_game(db: Session, game_id: int) -> dict | None:
     result = db.execute(
         text("""
             SELECT
@@ -53,10 +229,43 @@ def get_game(db: Session, game_id: int) -> dict | None:
         {"id": game_id}
     ).mappings().first()
 
-    if not result:
-        raise HTTPException(status_code=404, detail="ไม่พบข้อมูลเกมนี้")
+    return dict(result) if result else None
 
-    return result
+
+def get_games_by_ids(db: Session, game_ids: List[int]) -> dict:
+    ordered = list(dict.fromkeys(int(g) for g in game_ids))
+    found: dict[int, dict | None] = {}
+    to_fetch = []
+    for gid in ordered:
+        cached = catalog_cache.get(("game", gid), _NOT_CACHED)
+        if cached is _NOT_CACHED:
+            to_fetch.append(gid)
+        else:
+            found[gid] = cached
+
+    if to_fetch:
+        version = catalog_cache.version
+        rows = db.execute(
+            text("""
+                SELECT
+                    g.id, g.name, c.name AS category_name,
+                    g.description, g.price, g.release_date, g.image_url
+                FROM games AS g
+                JOIN game_category AS c ON g.category_id = c.id
+                WHERE g.id IN :ids
+            """),
+            {"ids": tuple(to_fetch)}
+        ).mappings().all()
+
+        fetched = {int(r["id"]): dict(r) for r in rows}
+        for gid in to_fetch:
+            found[gid] = fetched.get(gid)
+            catalog_cache.set(("game", gid), found[gid], version=version)
+
+    return {
+        "items": [found[gid] for gid in ordered if found[gid]],
+        "missing": [gid for gid in ordered if not found[gid]],
+    }
 
 
 def unique_name(db: Session, name: str, game_id: int) -> None:
@@ -67,22 +276,17 @@ def unique_name(db: Session, name: str, game_id: int) -> None:
     if dup:
         raise HTTPException(status_code=409, detail="ชื่อเกมนี้ถูกใช้แล้ว")
 
-def create_game_with_file(db: Session, game, image_file) -> dict | None:
+def ensure_game_name_available(db: Session, name: str) -> None:
     existing = db.execute(
         text("SELECT id FROM games WHERE name = :name"),
-        {"name": game.name}
+        {"name": name}
     ).first()
 
     if existing:
         raise HTTPException(status_code=409, detail="ชื่อเกมนี้ถูกใช้แล้ว")
 
-    file_bytes = image_file.file.read()
-    img_url = upload_game_image(
-        file_bytes=file_bytes,
-        filename=image_file.filename,
-        content_type=image_file.content_type or "application/octet-stream"
-    )
 
+def create_game(db: Session, game) -> dict | None:
     sql = text("""
         INSERT INTO games (name, category_id, description, price, release_date, image_url, created_at)
         VALUES (:name, :category_id, :description, :price, :release_date, :image_url, :created_at);
@@ -94,12 +298,13 @@ def create_game_with_file(db: Session, game, image_file) -> dict | None:
         "description": game.description,
         "price": game.price,
         "release_date": thai_date(),
-        "image_url": img_url,
+        "image_url": game.image_url,
         "created_at": datetime.now()
     }
 
     db.execute(sql, params)
     db.commit()
+    catalog_cache.invalidate()
 
     row = db.execute(
         text("SELECT id, name, category_id, description, price, release_date, image_url, created_at FROM games WHERE name = :name"),
@@ -109,6 +314,50 @@ def create_game_with_file(db: Session, game, image_file) -> dict | None:
     return row
 
 
+def get_existing_game_names(db: Session, names: List[str]) -> set[str]:
+    if not names:
+        return set()
+    rows = db.execute(
+        text("SELECT name FROM games WHERE name IN :names"),
+        {"names": tuple(names)}
+    ).scalars().all()
+    return {n.casefold() for n in rows}
+
+
+def get_existing_category_ids(db: Session, category_ids: set[int]) -> set[int]:
+    if not category_ids:
+        return set()
+    rows = db.execute(
+        text("SELECT id FROM game_category WHERE id IN :ids"),
+        {"ids": tuple(category_ids)}
+    ).scalars().all()
+    return set(rows)
+
+
+def bulk_insert_games(db: Session, games: List[dict]) -> int:
+    sql = text("""
+        INSERT INTO games (name, category_id, description, price, release_date, image_url, created_at)
+        VALUES (:name, :category_id, :description, :price, :release_date, :image_url, :created_at);
+    """)
+
+    release_date = thai_date()
+    created_at = datetime.now()
+    chunk = settings.IMPORT_INSERT_CHUNK
+    try:
+        for start in range(0, len(games), chunk):
+            db.execute(sql, [
+                {**g, "release_date": release_date, "created_at": created_at}
+                for g in games[start:start + chunk]
+            ])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"นำเข้าเกมไม่สำเร็จ: {e}")
+
+    catalog_cache.invalidate()
+    return len(games)
+
+
 def create_game_category(db: Session, name: str) -> dict | None:
     existing = db.execute(
         text("SELECT id FROM game_category WHERE name = :name"),
@@ -126,6 +375,7 @@ def create_game_category(db: Session, name: str) -> dict | None:
     """)
     db.execute(sql, {"name": name})
     db.commit()
+    catalog_cache.invalidate()
 
 
     row = db.execute(
@@ -138,7 +388,10 @@ def create_game_category(db: Session, name: str) -> dict | None:
 
 def get_game_category(db: Session):
     try:
-        result = db.execute(text("SELECT * FROM game_category ORDER by id")).mappings().all() 
+        result = catalog_cache.get_or_load(
+            ("category",),
+            lambda: [dict(r) for r in db.execute(text("SELECT * FROM game_category ORDER by id")).mappings().all()],
+        )
 
         if not result:
             raise HTTPException(status_code=404, detail="No game categories found")
@@ -175,6 +428,7 @@ def update_game_without_file(db: Session, game_id: int, game) -> dict:
 
     db.execute(sql, params)
     db.commit()
+    catalog_cache.invalidate()
 
     result = get_game(db, game_id)
     return result
@@ -189,10 +443,9 @@ def update_game_with_file(db: Session, game_id: int, game, image_file: UploadFil
     if image_file.content_type not in {"image/png", "image/jpeg"}:
         raise HTTPException(status_code=400, detail="อนุญาตเฉพาะภาพ PNG/JPEG")
 
-    file_bytes = image_file.file.read()
+    file_bytes = read_file_chunks(image_file.file)
     img_url = upload_game_image(
         file_bytes=file_bytes,
-        filename=image_file.filename,
         content_type=image_file.content_type or "application/octet-stream",
     )
 
@@ -217,18 +470,98 @@ def update_game_with_file(db: Session, game_id: int, game, image_file: UploadFil
 
     db.execute(sql, params)
     db.commit()
+    catalog_cache.invalidate()
 
     result = get_game(db, game_id)
     return result
 
 
-def delete_game_and_dependencies(db: Session, game_id: int):
+def _recalc_orders_without_game(db: Session, game_id: int, order_ids: List[int] | None = None) -> int:
+    # คำนวณ subtotal/total ใหม่ของทุก order ที่มีเกมนี้ด้วย UPDATE เดียว (ต้องเรียกก่อนลบ order_items)
+    scope = "AND order_id IN :oids" if order_ids is not None else ""
+    params = {"gid": game_id}
+    if order_ids is not None:
+        params["oids"] = tuple(order_ids)
+
+    return db.execute(
+        text(f"""
+            UPDATE orders o
+            JOIN (
+                SELECT
+                    oi.order_id,
+                    COALESCE(SUM(CASE WHEN oi.game_id <> :gid THEN oi.unit_price * oi.quantity END), 0) AS new_subtotal
+                FROM order_items oi
+                JOIN (
+                    SELECT DISTINCT order_id
+                    FROM order_items
+                    WHERE game_id = :gid {scope}
+                ) affected ON affected.order_id = oi.order_id
+                GROUP BY oi.order_id
+            ) r ON r.order_id = o.id
+               SET o.subtotal_amount = r.new_subtotal,
+                   o.total_amount    = GREATEST(0, r.new_subtotal - COALESCE(o.discount_amount, 0))
+        """),
+        params
+    ).rowcount
+
+
+def _delete_game_refs(db: Session, game_id: int) -> None:
+    _recalc_orders_without_game(db, game_id)
+
+    db.execute(
+        text("DELETE FROM user_game_licenses WHERE game_id = :gid"),
+        {"gid": game_id}
+    )
+    db.execute(
+        text("DELETE FROM order_items WHERE game_id = :gid"),
+        {"gid": game_id}
+    )
+
+
+def _delete_game_refs_chunked(db: Session, game_id: int, chunk_size: int) -> None:
+    # ทำทีละชุดของ order และ commit ทุกชุด เพื่อไม่ให้ถือ lock นานใน transaction เดียว
+    # ถ้าล้มกลางทางสามารถเรียกซ้ำได้ เพราะแถวที่ทำไปแล้วถูกลบออกจาก order_items แล้ว
+    while True:
+        order_ids = db.execute(
+            text("""
+                SELECT DISTINCT order_id
+                FROM order_items
+                WHERE game_id = :gid
+                ORDER BY order_id
+                LIMIT :lim
+            """),
+            {"gid": game_id, "lim": chunk_size}
+        ).scalars().all()
+        if not order_ids:
+            break
+
+        _recalc_orders_without_game(db, game_id, order_ids)
+        db.execute(
+            text("DELETE FROM user_game_licenses WHERE game_id = :gid AND order_id IN :oids"),
+            {"gid": game_id, "oids": tuple(order_ids)}
+        )
+        db.execute(
+            text("DELETE FROM order_items WHERE game_id = :gid AND order_id IN :oids"),
+            {"gid": game_id, "oids": tuple(order_ids)}
+        )
+        db.commit()
+
+    while db.execute(
+        text("DELETE FROM user_game_licenses WHERE game_id = :gid LIMIT :lim"),
+        {"gid": game_id, "lim": chunk_size}
+    ).rowcount:
+        db.commit()
+
+
+def delete_game_and_dependencies(db: Session, game_id: int, chunk_size: int | None = None):
     """
     ลบเกมและความสัมพันธ์ที่อ้างถึงเกมนี้ทั้งหมด
+    - อัปเดต orders ที่ได้รับผลกระทบ (recalc subtotal/total) ด้วย UPDATE ... JOIN เดียว
     - ลบ user_game_licenses ที่ game_id = :gid
     - ลบ order_items ที่ game_id = :gid
-    - อัปเดต orders ที่ได้รับผลกระทบ (recalc subtotal/total)
+    - ลบยอดขายรายวันของเกมนี้จาก daily_game_sales
     - ลบเกมจาก games
+    ถ้าระบุ chunk_size จะทำทีละ chunk_size orders และ commit ทีละชุด (สำหรับเกมที่ขายไปเยอะมาก)
     *หมายเหตุ*: ไม่ลบ orders/transactions เพื่อคงประวัติการชำระเงิน
     """
     try:
@@ -239,60 +572,22 @@ def delete_game_and_dependencies(db: Session, game_id: int):
         if not game:
             raise HTTPException(status_code=404, detail="ไม่พบเกมที่ต้องการลบ")
 
-        affected_order_ids: List[int] = db.execute(
-            text("""
-                SELECT DISTINCT order_id
-                FROM order_items
-                WHERE game_id = :gid
-            """),
-            {"gid": game_id}
-        ).scalars().all()
-
-        del_licenses = db.execute(
-            text("DELETE FROM user_game_licenses WHERE game_id = :gid"),
-            {"gid": game_id}
-        ).rowcount
+        if chunk_size:
+            _delete_game_refs_chunked(db, game_id, chunk_size)
+        else:
+            _delete_game_refs(db, game_id)
 
-        del_order_items = db.execute(
-            text("DELETE FROM order_items WHERE game_id = :gid"),
+        db.execute(
+            text("DELETE FROM daily_game_sales WHERE game_id = :gid"),
             {"gid": game_id}
-        ).rowcount
-
-        updated_orders = 0
-        if affected_order_ids:
-            recalc_rows = db.execute(
-                text("""
-                    SELECT
-                        o.id,
-                        COALESCE(SUM(oi.unit_price * oi.quantity), 0) AS new_subtotal,
-                        o.discount_amount
-                    FROM orders o
-                    LEFT JOIN order_items oi ON oi.order_id = o.id
-                    WHERE o.id IN :oids
-                    GROUP BY o.id, o.discount_amount
-                """),
-                {"oids": tuple(affected_order_ids)}
-            ).mappings().all()
-
-            for r in recalc_rows:
-                new_subtotal = float(r["new_subtotal"] or 0)
-                discount     = float(r["discount_amount"] or 0)
-                new_total    = max(0.0, new_subtotal - discount)
-
-                db.execute(
-                    text("""
-                        UPDATE orders
-                           SET subtotal_amount = :subt,
-                               total_amount    = :tot
-                         WHERE id = :oid
-                    """),
-                    {"subt": new_subtotal, "tot": new_total, "oid": int(r["id"])}
-                )
-                updated_orders += 1
+        )
 
         db.execute(text("DELETE FROM games WHERE id = :gid"), {"gid": game_id})
 
         db.commit()
+        catalog_cache.invalidate()
+        library_cache.invalidate()
+        license_index.clear()
 
         return {"message": f"ลบเกม '{game['name']}' (id={game_id}) สำเร็จ"}
 
@@ -324,48 +619,91 @@ def get_purchased_games_by_user(db: Session, user_id: int):
     return result
 
 
+def _fetch_user_library(db: Session, user_id: int) -> dict:
+    rows = db.execute(
+        text("""
+            SELECT 
+                g.id AS id,
+                g.name AS name,
+                gc.name AS category_name,
+                g.description,
+                g.price,
+                g.release_date,
+                g.image_url
+            FROM user_game_licenses ugl
+            JOIN games g ON ugl.game_id = g.id
+            LEFT JOIN game_category gc ON g.category_id = gc.id
+            WHERE ugl.user_id = :uid
+            ORDER BY ugl.order_id DESC, g.id DESC
+        """),
+        {"uid": user_id}
+    ).mappings().all()
+
+    recent = [dict(r) for r in rows]
+    by_name = sorted(recent, key=lambda g: ((g["name"] or "").casefold(), g["id"]))
+    return {
+        "recent": (recent, {g["id"]: i for i, g in enumerate(recent)}),
+        "name": (by_name, {g["id"]: i for i, g in enumerate(by_name)}),
+    }
+
+
+def get_user_library_page(
+    db: Session,
+    user_id: int,
+    limit: int = 20,
+    after: int | None = None,
+    sort: Literal["recent", "name"] = "recent",
+) -> dict:
+    # คลังเกมทั้งหมดของผู้ใช้ถูก cache ไว้ (ล้างเมื่อซื้อเกม/ลบเกม) แต่ละหน้าจึงเป็นแค่การ slice
+    library = library_cache.get_or_load(user_id, lambda: _fetch_user_library(db, user_id))
+    items, positions = library[sort]
+
+    start = 0
+    if after is not None:
+        if after not in positions:
+            raise HTTPException(status_code=400, detail="cursor ไม่ถูกต้อง")
+        start = positions[after] + 1
+
+    page = items[start:start + limit]
+    next_cursor = page[-1]["id"] if start + limit < len(items) else None
+    return {"items": page, "next_cursor": next_cursor}
+
+
 def get_daily_top_selling_games(
     db: Session,
     days: int = 7,
     top_n: int = 5,
     order_by: Literal["units", "revenue"] = "units",
 ):
-    order_col = "total_units" if order_by == "units" else "total_revenue"
+    order_col = "units" if order_by == "units" else "revenue"
 
+    # อ่านจาก rollup daily_game_sales (อัปเดตตอนซื้อ) ไม่ต้อง scan orders/order_items
     sql = text(f"""
-        WITH daily AS (
+        WITH ranked AS (
             SELECT
-                DATE(o.created_at)               AS sale_date,
-                g.id                             AS game_id,
+                s.sale_date                      AS sale_date,
+                s.game_id                        AS game_id,
                 g.name                           AS game_name,
                 gc.name                          AS category_name,
-                g.image_url                      AS image_url,   
-                SUM(oi.quantity)                 AS total_units,
-                SUM(oi.quantity * oi.unit_price) AS total_revenue
-            FROM orders o
-            JOIN order_items oi ON oi.order_id = o.id
-            JOIN games g        ON g.id = oi.game_id
-            LEFT JOIN game_category gc ON gc.id = g.category_id
-            WHERE o.status = 'fulfilled'
-              AND o.created_at >= DATE_SUB(CURDATE(), INTERVAL :days_minus_one DAY)
-              AND o.created_at <  DATE_ADD(CURDATE(), INTERVAL 1 DAY)
-            GROUP BY DATE(o.created_at), g.id, g.name, gc.name, g.image_url 
-        ),
-        ranked AS (
-            SELECT
-                d.*,
+                g.image_url                      AS image_url,
+                s.units                          AS total_units,
+                s.revenue                        AS total_revenue,
                 ROW_NUMBER() OVER (
-                    PARTITION BY d.sale_date
-                    ORDER BY d.{order_col} DESC, d.total_revenue DESC, d.game_name ASC
+                    PARTITION BY s.sale_date
+                    ORDER BY s.{order_col} DESC, s.revenue DESC, g.name ASC
                 ) AS rnk
-            FROM daily d
+            FROM daily_game_sales s
+            JOIN games g ON g.id = s.game_id
+            LEFT JOIN game_category gc ON gc.id = g.category_id
+            WHERE s.sale_date >= DATE_SUB(CURDATE(), INTERVAL :days_minus_one DAY)
+              AND s.sale_date <= CURDATE()
         )
         SELECT
             sale_date,
             game_id,
             game_name,
             category_name,
-            image_url,      
+            image_url,
             total_units,
             total_revenue,
             rnk
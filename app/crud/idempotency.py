@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+
+def reserve_idempotency_key(db: Session, user_id: int, key: str, endpoint: str, request_hash: str, owner: str, ttl: int) -> bool:
+    """จอง key ด้วยแถว status = pending (commit ทันทีให้ request ซ้ำเห็น) คืน False ถ้ามี key นี้อยู่แล้ว"""
+    try:
+        db.execute(
+            text("""
+                INSERT INTO idempotency_keys (user_id, idem_key, endpoint, request_hash, status, owner, created_at, expires_at)
+                VALUES (:user_id, :idem_key, :endpoint, :request_hash, 'pending', :owner, :now, :expires_at)
+            """),
+            {
+                "user_id": user_id,
+                "idem_key": key,
+                "endpoint": endpoint,
+                "request_hash": request_hash,
+                "owner": owner,
+                "now": datetime.now(),
+                "expires_at": datetime.now() + timedelta(seconds=ttl),
+            }
+        )
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+
+def get_idempotency_key(db: Session, user_id: int, key: str):
+    return db.execute(
+        text("""
+            SELECT endpoint, request_hash, status, owner, response_body, created_at, expires_at
+            FROM idempotency_keys
+            WHERE user_id = :user_id AND idem_key = :idem_key
+        """),
+        {"user_id": user_id, "idem_key": key}
+    ).mappings().first()
+
+
+def take_over_idempotency_key(db: Session, user_id: int, key: str, old_owner: str, owner: str) -> bool:
+    """รับช่วงการจองที่ค้าง pending (request เดิมตายก่อน commit) คืน False ถ้ามีคนอื่นรับไปก่อน"""
+    result = db.execute(
+        text("""
+            UPDATE idempotency_keys
+            SET owner = :owner, created_at = :now
+            WHERE user_id = :user_id AND idem_key = :idem_key
+              AND status = 'pending' AND owner = :old_owner
+        """),
+        {"user_id": user_id, "idem_key": key, "owner": owner, "old_owner": old_owner, "now": datetime.now()}
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def complete_idempotency_key(db: Session, user_id: int, key: str, owner: str, response_body: str) -> bool:
+    """บันทึกผลลัพธ์ใน transaction ของผู้เรียก (ไม่ commit เอง) คืน False ถ้าการจองไม่ใช่ของ owner นี้แล้ว"""
+    result = db.execute(
+        text("""
+            UPDATE idempotency_keys
+            SET status = 'done', response_body = :response_body
+            WHERE user_id = :user_id AND idem_key = :idem_key
+              AND status = 'pending' AND owner = :owner
+        """),
+        {"user_id": user_id, "idem_key": key, "owner": owner, "response_body": response_body}
+    )
+    return result.rowcount == 1
+
+
+def release_idempotency_key(db: Session, user_id: int, key: str, owner: str) -> None:
+    db.rollback()
+    db.execute(
+        text("""
+            DELETE FROM idempotency_keys
+            WHERE user_id = :user_id AND idem_key = :idem_key
+              AND status = 'pending' AND owner = :owner
+        """),
+        {"user_id": user_id, "idem_key": key, "owner": owner}
+    )
+    db.commit()
+
+
+def delete_expired_idempotency_key(db: Session, user_id: int, key: str) -> None:
+    db.execute(
+        text("DELETE FROM idempotency_keys WHERE user_id = :user_id AND idem_key = :idem_key AND expires_at < :now"),
+        {"user_id": user_id, "idem_key": key, "now": datetime.now()}
+    )
+    db.commit()
+
+
+def purge_expired_idempotency_keys(db: Session) -> int:
+    result = db.execute(text("DELETE FROM idempotency_keys WHERE expires_at < :now"), {"now": datetime.now()})
+    db.commit()
+    return result.rowcount
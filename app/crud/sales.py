@@ -0,0 +1,64 @@
+from typing import Iterable, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+# ---------- RECORD DAILY SALES (ภายใน transaction ของการซื้อ) ----------
+def record_daily_sales(db: Session, items: Iterable[dict]) -> None:
+    rows = [
+        {"gid": int(i["game_id"]), "units": int(i.get("units", 1)), "revenue": float(i["revenue"])}
+        for i in items
+    ]
+    if not rows:
+        return
+
+    db.execute(
+        text("""
+            INSERT INTO daily_game_sales (sale_date, game_id, units, revenue)
+            VALUES (CURDATE(), :gid, :units, :revenue)
+            ON DUPLICATE KEY UPDATE
+                units   = units + VALUES(units),
+                revenue = revenue + VALUES(revenue)
+        """),
+        rows,
+    )
+
+
+# ---------- BACKFILL DAILY SALES ----------
+def backfill_daily_game_sales(db: Session, days: Optional[int] = None) -> int:
+    """
+    คำนวณ daily_game_sales ใหม่จาก orders/order_items
+    - days=None คำนวณใหม่ทั้งหมด, ไม่งั้นเฉพาะ N วันล่าสุด (รวมวันนี้)
+    ทำใน transaction เดียว ถ้ามีการซื้อเข้ามาระหว่างนั้นจะรอจน backfill commit
+    """
+    params = {}
+    date_filter = ""
+    order_filter = ""
+    if days is not None:
+        params["days_minus_one"] = max(0, days - 1)
+        date_filter = "WHERE sale_date >= DATE_SUB(CURDATE(), INTERVAL :days_minus_one DAY)"
+        order_filter = "AND o.created_at >= DATE_SUB(CURDATE(), INTERVAL :days_minus_one DAY)"
+
+    try:
+        db.execute(text(f"DELETE FROM daily_game_sales {date_filter}"), params)
+        inserted = db.execute(
+            text(f"""
+                INSERT INTO daily_game_sales (sale_date, game_id, units, revenue)
+                SELECT
+                    DATE(o.created_at),
+                    oi.game_id,
+                    SUM(oi.quantity),
+                    SUM(oi.quantity * oi.unit_price)
+                FROM orders o
+                JOIN order_items oi ON oi.order_id = o.id
+                WHERE o.status = 'fulfilled'
+                  {order_filter}
+                GROUP BY DATE(o.created_at), oi.game_id
+            """),
+            params,
+        ).rowcount
+        db.commit()
+        return inserted
+    except Exception:
+        db.rollback()
+        raise
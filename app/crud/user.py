@@ -3,7 +3,7 @@ from pymysql import IntegrityError
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 from datetime import datetime
-from app.services.upload_service import upload_avatar
+from app.services.upload_service import read_file_chunks, upload_avatar
 from app.core.security import hash_password, verify_password
 
 
@@ -16,17 +16,12 @@ def _email_exists(db: Session, email: str, exclude_user_id: int | None = None) -
         return db.execute(sql, {"email": email, "id": exclude_user_id}).scalar() is not None
     
 
-def create_user_with_file(db: Session, user, image_file) -> dict | None:
-    if _email_exists(db, user.email):
+def ensure_email_available(db: Session, email: str) -> None:
+    if _email_exists(db, email):
         raise HTTPException(status_code=409, detail="อีเมลนี้ถูกใช้แล้ว")
 
-    file_bytes = image_file.file.read()
-    img_url = upload_avatar(
-        file_bytes=file_bytes,
-        filename=image_file.filename,
-        content_type=image_file.content_type or "application/octet-stream"
-    )
 
+def create_user(db: Session, user, img_url: str) -> dict | None:
     password_hashed = hash_password(user.password)
 
     sql = text("""
@@ -68,6 +63,14 @@ def get_user_by_email(db: Session, email: str):
     return row
 
 
+def set_password_hash(db: Session, user_id: int, password_hash: str) -> None:
+    db.execute(
+        text("UPDATE users SET password_hash = :password_hash WHERE id = :id"),
+        {"password_hash": password_hash, "id": user_id}
+    )
+    db.commit()
+
+
 def _update_user_simple(db: Session, user_id: int, data: dict) -> dict | None:
     if not data:
         return None
@@ -113,10 +116,9 @@ def update_profile_with_file(db: Session, user_id: int, payload, image_file) ->
         updated["email"] = data_in["email"]
 
     if image_file:
-        file_bytes = image_file.file.read()
+        file_bytes = read_file_chunks(image_file.file)
         img_url = upload_avatar(
             file_bytes=file_bytes,
-            filename=image_file.filename,
             content_type=image_file.content_type or "application/octet-stream"
         )
         updated["img_url"] = img_url
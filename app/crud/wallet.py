@@ -1,10 +1,13 @@
 from datetime import datetime, timedelta, timezone
 import re
-from typing import Iterable, Literal, Optional
+from typing import Callable, Iterable, Literal, Optional
 from fastapi import HTTPException
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from app.core.cache import library_cache
+from app.crud.sales import record_daily_sales
+from app.services.license_index import license_index
 from app.utils import function 
 
 # ---------- READ WALLET BALANCE BY ID ----------
@@ -19,27 +22,22 @@ def get_balance(db: Session, user_id: int):
     return result
 
 # ---------- ADD WALLET BALANCE ----------
-def add_balance(db: Session, user_id: int, amount: float):
-    user = db.execute(
-        text("SELECT id, wallet_balance FROM users WHERE id = :id"),
-        {"id": user_id}
-    ).mappings().first()
-    if not user:
-        raise HTTPException(status_code=404, detail="ไม่พบบัญชีผู้ใช้")
-
+def add_balance(db: Session, user_id: int, amount: float, before_commit: Optional[Callable[[dict], None]] = None):
     if amount is None or float(amount) <= 0:
         raise HTTPException(status_code=400, detail="amount must be positive")
 
-    new_balance = float(user["wallet_balance"] or 0) + float(amount)
-
-    db.execute(
+    # บวกยอดใน UPDATE เดียว: top-up พร้อมกันไม่ทับยอดกัน และไม่ต้อง SELECT ก่อน
+    result = db.execute(
         text("""
             UPDATE users
-            SET wallet_balance = :balance
+            SET wallet_balance = COALESCE(wallet_balance, 0) + :amount
             WHERE id = :id
         """),
-        {"id": user_id, "balance": new_balance}
+        {"id": user_id, "amount": float(amount)}
     )
+    if result.rowcount == 0:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="ไม่พบบัญชีผู้ใช้")
 
     db.execute(
     text("""
@@ -55,17 +53,23 @@ def add_balance(db: Session, user_id: int, amount: float):
         }
     )
 
-    db.commit()
-
+    # อ่านก่อน commit: แถวยังถูก lock โดย UPDATE ข้างบน จึงได้ยอดหลัง top-up ครั้งนี้พอดี
     row = db.execute(
         text("SELECT id, wallet_balance FROM users WHERE id = :id"),
         {"id": user_id}
     ).mappings().first()
 
-    return {"id": row.id,
-            "amount": amount,
-            "wallet_balance": row.wallet_balance
-            }
+    result = {"id": row.id,
+              "amount": amount,
+              "wallet_balance": row.wallet_balance
+              }
+    # เช่นบันทึกผลของ Idempotency-Key: ให้ commit พร้อมกับยอดเงินใน transaction เดียวกัน
+    if before_commit is not None:
+        before_commit(result)
+
+    db.commit()
+
+    return result
 
 # ---------- READ TRANSACTION BY ID ----------
 def get_transactions_by_user_id(db: Session, user_id: int):
@@ -85,7 +89,7 @@ def get_transactions_by_user_id(db: Session, user_id: int):
 def _load_discount(db, code_id: int):
     dc = db.execute(
         text("""
-            SELECT id, code, type, value, max_discount, usage_limit, status
+            SELECT id, code, type, value, max_discount, usage_limit, used_count, status
             FROM discount_codes
             WHERE id = :cid
         """),
@@ -96,17 +100,29 @@ def _load_discount(db, code_id: int):
     if dc["status"] != "active":
         raise HTTPException(status_code=400, detail="โค้ดนี้ไม่พร้อมใช้งาน")
 
-    used = db.execute(
-        text("SELECT COUNT(*) FROM discount_redemptions WHERE code_id = :cid"),
-        {"cid": code_id},
-    ).scalar() or 0
-
-    if dc["usage_limit"] is not None and used >= int(dc["usage_limit"]):
+    # เช็คเร็วก่อนคำนวณ; การจองสิทธิ์จริงทำด้วย _claim_discount ตอนบันทึก redemption
+    if dc["usage_limit"] is not None and int(dc["used_count"]) >= int(dc["usage_limit"]):
         raise HTTPException(status_code=400, detail="โค้ดนี้ถูกใช้ครบจำนวนแล้ว")
 
     return dc
 
 
+def _claim_discount(db, code_id: int) -> None:
+    # เพิ่ม used_count เฉพาะเมื่อยังไม่เกิน limit ใน UPDATE เดียว: ซื้อพร้อมกันก็ใช้เกิน limit ไม่ได้
+    result = db.execute(
+        text("""
+            UPDATE discount_codes
+            SET used_count = used_count + 1
+            WHERE id = :cid
+              AND status = 'active'
+              AND (usage_limit IS NULL OR used_count < usage_limit)
+        """),
+        {"cid": code_id},
+    )
+    if result.rowcount == 0:
+        raise HTTPException(status_code=400, detail="โค้ดนี้ถูกใช้ครบจำนวนแล้ว")
+
+
 def _calc_discount(subtotal: float, dc: dict) -> float:
     t = dc["type"]
     val = float(dc["value"])
@@ -124,6 +140,7 @@ def purchase_games(
     user_id: int,
     game_ids: Iterable[int],
     discount_code_id: Optional[int] = None, 
+    before_commit: Optional[Callable[[dict], None]] = None,
 ):
     game_ids = [int(g) for g in game_ids if g is not None]
     if not game_ids:
@@ -201,6 +218,11 @@ def purchase_games(
             ]
         )
 
+        record_daily_sales(
+            db,
+            [{"game_id": int(g["id"]), "units": 1, "revenue": float(g["price"])} for g in games]
+        )
+
         new_balance = wallet_balance - total
         db.execute(
             text("UPDATE users SET wallet_balance = :bal WHERE id = :uid"),
@@ -224,6 +246,7 @@ def purchase_games(
         )
 
         if discount_dc is not None and discount > 0:
+            _claim_discount(db, int(discount_dc["id"]))
             db.execute(
                 text("""
                     INSERT INTO discount_redemptions (code_id, user_id, order_id, discount_amount)
@@ -237,9 +260,7 @@ def purchase_games(
             {"now": now_th, "oid": order_id}
         )
 
-        db.commit()
-
-        return {
+        result = {
             "order_id": order_id,
             "subtotal": subtotal,
             "discount": discount,
@@ -248,6 +269,14 @@ def purchase_games(
             "used_code_id": int(discount_dc["id"]) if discount_dc else None,
             "order_time": now_th,
         }
+        if before_commit is not None:
+            before_commit(result)
+
+        db.commit()
+        library_cache.pop(user_id)
+        license_index.add(user_id, [int(g["id"]) for g in games])
+
+        return result
 
     except HTTPException:
         db.rollback()
@@ -261,9 +290,10 @@ def purchase_one_game(
     db: Session,
     user_id: int,
     game_id: int,
-    discount_code_id: Optional[int] = None
+    discount_code_id: Optional[int] = None,
+    before_commit: Optional[Callable[[dict], None]] = None,
 ):
-    return purchase_games(db, user_id, [game_id], discount_code_id=discount_code_id)
+    return purchase_games(db, user_id, [game_id], discount_code_id=discount_code_id, before_commit=before_commit)
 
 # ---------- READ TRANSACTION ----------
 def get_user_transactions(db: Session, user_id: int):
@@ -519,13 +549,8 @@ def get_all_discount_codes_with_usage(db):
         dc.max_discount,
         dc.usage_limit,
         dc.status,
-        COALESCE(COUNT(dr.id), 0) AS used_count
+        dc.used_count
         FROM discount_codes dc
-        LEFT JOIN discount_redemptions dr
-        ON dr.code_id = dc.id
-        GROUP BY
-        dc.id, dc.code, dc.type, dc.value, dc.max_discount,
-        dc.usage_limit, dc.status
         ORDER BY dc.created_at DESC
     """)
     rows = db.execute(sql).mappings().all()
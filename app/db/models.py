@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Date, Integer, Numeric, String
 from app.db.database import Base
 
 
@@ -10,3 +10,13 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, index=True, nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
+
+
+# rollup ยอดขายรายวันต่อเกม อัปเดตใน transaction เดียวกับการซื้อ
+class DailyGameSales(Base):
+    __tablename__ = "daily_game_sales"
+
+    sale_date = Column(Date, primary_key=True)
+    game_id = Column(Integer, primary_key=True, index=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
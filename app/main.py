@@ -1,16 +1,41 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from app.controller.auth import router as auth_router
+from app.controller.export import router as export_router
 from app.controller.index import router as index_router
 from app.controller.user import router as user_router
 from app.controller.game import router as game_router
 from app.controller.wallet import router as wallet_router
+from app.core.config import settings
+from app.core.security import password_hasher
 from app.db import models
 from app.db.database import engine
+from app.services import upload_service
+from app.services.job_service import jobs
+from app.services.leaderboard_service import top_selling_cache
 
 models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="My API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # refresh leaderboard เบื้องหลัง (ค่าเริ่มต้นของหน้าแรก: 7 วัน, 5 อันดับ, units)
+    refresher = asyncio.create_task(top_selling_cache.run(warm_keys=((7, 5, "units"),)))
+    await asyncio.to_thread(password_hasher.start)
+    try:
+        yield
+    finally:
+        refresher.cancel()
+        password_hasher.shutdown()
+        jobs.shutdown()
+        upload_service.shutdown()
+
+
+app = FastAPI(title="My API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,8 +45,13 @@ app.add_middleware(
     allow_headers=["*"],       # อนุญาตทุก header เช่น Authorization, Content-Type
 )
 
+if settings.STORAGE_BACKEND == "local":
+    os.makedirs(settings.LOCAL_STORAGE_DIR, exist_ok=True)
+    app.mount(settings.LOCAL_STORAGE_URL, StaticFiles(directory=settings.LOCAL_STORAGE_DIR), name="uploads")
+
 app.include_router(index_router)
 app.include_router(user_router)
 app.include_router(auth_router)
 app.include_router(game_router) 
 app.include_router(wallet_router)
+app.include_router(export_router)
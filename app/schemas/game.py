@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Literal, Optional
-from pydantic import BaseModel
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from app.utils.function import thumbnail_url
 
 class GameBase(BaseModel):
     name: str
@@ -12,6 +13,26 @@ class GameBase(BaseModel):
 class GameCreate(GameBase):
     pass
 
+class GameImportRow(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    category_id: int
+    description: str = ""
+    price: float = Field(..., ge=0)
+    image_url: Optional[str] = None
+    image: Optional[str] = None
+
+    @field_validator("name", mode="before")
+    @classmethod
+    def _strip_name(cls, v):
+        # strip ก่อนเช็ค min_length: ชื่อที่มีแต่ช่องว่างต้องไม่ผ่าน
+        return v.strip() if isinstance(v, str) else v
+
+    @model_validator(mode="after")
+    def _require_image(self):
+        if not self.image_url and not self.image:
+            raise ValueError("ต้องระบุ image_url หรือ image (ชื่อไฟล์ใน archive)")
+        return self
+
 class GameUpdate(BaseModel):
     name: Optional[str] = None
     category_id: Optional[int] = None
@@ -26,10 +47,35 @@ class GameResponse(BaseModel):
     price: float
     release_date: Optional[str]
     image_url: Optional[str]
+    thumbnail_url: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _fill_thumbnail(self):
+        if self.thumbnail_url is None:
+            self.thumbnail_url = thumbnail_url(self.image_url)
+        return self
 
     class Config:
         from_attributes = True
 
+class GamePage(BaseModel):
+    items: List[GameResponse]
+    next_cursor: Optional[int] = None
+
+class GameFacet(BaseModel):
+    category_id: int
+    category_name: str
+    count: int
+
+class GameBrowse(BaseModel):
+    total: int
+    items: List[GameResponse]
+    facets: List[GameFacet]
+
+class GameBatch(BaseModel):
+    items: List[GameResponse]
+    missing: List[int]
+
 class GameCategory(BaseModel):
     id: int
     name: str
\ No newline at end of file
@@ -18,6 +18,11 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class LoginResponse(UserResponse):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
 class UserUpdate(BaseModel):
     username: Optional[str] = None
     email: Optional[str] = None
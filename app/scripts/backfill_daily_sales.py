@@ -0,0 +1,31 @@
+"""
+คำนวณตาราง daily_game_sales ใหม่จากประวัติการสั่งซื้อ
+
+    python -m app.scripts.backfill_daily_sales            # ทั้งหมด
+    python -m app.scripts.backfill_daily_sales --days 90  # เฉพาะ 90 วันล่าสุด
+"""
+import argparse
+
+from app.crud.sales import backfill_daily_game_sales
+from app.db import models
+from app.db.database import SessionLocal, engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill daily_game_sales rollup")
+    parser.add_argument("--days", type=int, default=None, help="จำนวนวันย้อนหลัง (ไม่ระบุ = ทั้งหมด)")
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        rows = backfill_daily_game_sales(db, days=args.days)
+    finally:
+        db.close()
+
+    print(f"daily_game_sales: เขียนใหม่ {rows} แถว")
+
+
+if __name__ == "__main__":
+    main()
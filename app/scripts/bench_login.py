@@ -0,0 +1,96 @@
+"""
+วัด throughput ของการตรวจรหัสผ่าน (Argon2) ตามขนาด process pool
+
+จำลอง login พร้อมกัน --clients ราย แต่ละรายเรียก verify ต่อเนื่อง --seconds วินาที
+ระหว่างนั้นวัด latency ของงานเบา (แทน request catalog) ใน thread pool เดียวกันด้วย
+
+    python -m app.scripts.bench_login
+    python -m app.scripts.bench_login --workers 0 1 2 4 8 --clients 32 --queue 16
+"""
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.core.security import PasswordHasher, pwd_context
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def run(workers: int, queue_limit: int, clients: int, seconds: float, password_hash: str) -> dict:
+    hasher = PasswordHasher(workers, queue_limit)
+    hasher.start()
+
+    ok = rejected = 0
+    login_ms: list[float] = []
+    cheap_ms: list[float] = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client() -> None:
+        nonlocal ok, rejected
+        while time.monotonic() < deadline:
+            t0 = time.perf_counter()
+            try:
+                hasher.verify("correct horse battery staple", password_hash)
+            except HTTPException:
+                with lock:
+                    rejected += 1
+                time.sleep(0.01)
+                continue
+            with lock:
+                ok += 1
+                login_ms.append((time.perf_counter() - t0) * 1000)
+
+    def cheap() -> None:
+        while time.monotonic() < deadline:
+            t0 = time.perf_counter()
+            sum(range(1000))
+            cheap_ms.append((time.perf_counter() - t0) * 1000)
+            time.sleep(0.005)
+
+    # thread pool ขนาดเท่าของ anyio (40) ใช้ร่วมกันทั้ง login และงานเบา
+    with ThreadPoolExecutor(max_workers=max(40, clients + 1)) as pool:
+        futures = [pool.submit(client) for _ in range(clients)] + [pool.submit(cheap)]
+        for f in futures:
+            f.result()
+    hasher.shutdown()
+
+    return {
+        "workers": workers,
+        "logins_per_s": ok / seconds,
+        "rejected_per_s": rejected / seconds,
+        "login_p50_ms": statistics.median(login_ms) if login_ms else 0.0,
+        "login_p95_ms": _percentile(login_ms, 0.95),
+        "cheap_p95_ms": _percentile(cheap_ms, 0.95),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Argon2 login throughput vs pool size")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4], help="ขนาด pool ที่จะทดสอบ (0 = inline)")
+    parser.add_argument("--queue", type=int, default=16, help="PASSWORD_HASH_QUEUE")
+    parser.add_argument("--clients", type=int, default=32, help="จำนวน login พร้อมกัน")
+    parser.add_argument("--seconds", type=float, default=5.0, help="เวลาทดสอบต่อขนาด pool")
+    args = parser.parse_args()
+
+    password_hash = pwd_context.hash("correct horse battery staple")
+    print(f"{'workers':>7} {'login/s':>9} {'503/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'cheap p95 ms':>13}")
+    for workers in args.workers:
+        r = run(workers, args.queue, args.clients, args.seconds, password_hash)
+        print(
+            f"{r['workers']:>7} {r['logins_per_s']:>9.1f} {r['rejected_per_s']:>9.1f} "
+            f"{r['login_p50_ms']:>9.1f} {r['login_p95_ms']:>9.1f} {r['cheap_p95_ms']:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+หาค่า Argon2 cost ที่ทำให้ verify ใช้เวลาใกล้เป้าหมายบนเครื่องนี้
+
+ตรึง memory cost / parallelism ไว้ แล้วเพิ่ม time cost จนถึงเป้า
+ถ้า time cost = 1 ยังช้าเกินเป้า จะลด memory cost ลงครึ่งหนึ่งจนกว่าจะทัน
+
+    python -m app.scripts.calibrate_argon2                     # เป้า 250 ms
+    python -m app.scripts.calibrate_argon2 --target-ms 100 --memory-kib 32768
+"""
+import argparse
+import statistics
+import time
+
+from passlib.hash import argon2
+
+from app.core.config import settings
+
+MIN_MEMORY_KIB = 8 * 1024
+
+
+def measure_ms(time_cost: int, memory_cost: int, parallelism: int, samples: int) -> float:
+    hasher = argon2.using(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    hashed = hasher.hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        t0 = time.perf_counter()
+        hasher.verify("calibration-password", hashed)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, memory_cost: int, parallelism: int, samples: int, max_time_cost: int = 20) -> tuple[int, int, float]:
+    while True:
+        elapsed = measure_ms(1, memory_cost, parallelism, samples)
+        print(f"  t=1 m={memory_cost} p={parallelism}: {elapsed:.1f} ms")
+        if elapsed <= target_ms or memory_cost // 2 < MIN_MEMORY_KIB:
+            break
+        memory_cost //= 2
+
+    best = (1, memory_cost, elapsed)
+    for time_cost in range(2, max_time_cost + 1):
+        elapsed = measure_ms(time_cost, memory_cost, parallelism, samples)
+        print(f"  t={time_cost} m={memory_cost} p={parallelism}: {elapsed:.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = (time_cost, memory_cost, elapsed)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrate Argon2 cost for a target verify latency")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="เวลา verify ที่ต้องการ (ms)")
+    parser.add_argument("--memory-kib", type=int, default=settings.ARGON2_MEMORY_COST, help="memory cost เริ่มต้น (KiB)")
+    parser.add_argument("--parallelism", type=int, default=settings.ARGON2_PARALLELISM)
+    parser.add_argument("--samples", type=int, default=5, help="จำนวนครั้งที่วัดต่อชุดค่า (ใช้ median)")
+    args = parser.parse_args()
+
+    print(f"current: t={settings.ARGON2_TIME_COST} m={settings.ARGON2_MEMORY_COST} p={settings.ARGON2_PARALLELISM}")
+    time_cost, memory_cost, elapsed = calibrate(args.target_ms, args.memory_kib, args.parallelism, args.samples)
+
+    print(f"\nverify ≈ {elapsed:.1f} ms (target {args.target_ms:.0f} ms) — ใส่ใน .env:")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
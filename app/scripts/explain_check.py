@@ -0,0 +1,174 @@
+"""
+รัน EXPLAIN กับทุกคำสั่ง SQL ใน app/crud/*.py (และ app/services/*.py)
+แล้ว fail ถ้าพบ full table scan (type = ALL) ที่ไม่มี index ให้เลือกใช้เลย
+
+    python -m app.scripts.explain_check            # ต้องต่อฐานข้อมูลที่ migrate แล้ว
+    python -m app.scripts.explain_check --strict   # fail ทุก type = ALL
+
+- placeholder แบบ :name ถูกแทนด้วย 1 (IN :ids -> IN (1))
+- SQL ที่สร้างจาก f-string ถูกแทนค่าด้วยตัวอย่างใน SAMPLE_RENDERINGS (ทุกชุดค่า)
+  ถ้ามีส่วนที่ไม่มีตัวอย่าง (เช่นแก้โค้ดแล้วไม่ได้เพิ่มตัวอย่าง) จะ fail
+- ฟังก์ชันใน ALLOW_FULL_SCAN ตั้งใจอ่านทั้งตารางอยู่แล้ว จึงไม่นับ
+"""
+import argparse
+import ast
+import itertools
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.db.database import engine
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_GLOBS = ["crud/*.py", "services/*.py"]
+
+ALLOW_FULL_SCAN = {
+    "_fetch_game_all",
+    "iter_game_chunks",
+    "get_game_category",
+    "get_users",
+    "get_all_discount_codes",
+    "get_all_discount_codes_with_usage",
+    "backfill_daily_game_sales",
+}
+
+# (ฟังก์ชัน, source ของนิพจน์ใน f-string) -> ค่าตัวอย่างที่เป็นไปได้ (EXPLAIN ทุกชุดค่า)
+SAMPLE_RENDERINGS = {
+    ("_fetch_game_page", "' AND '.join(where)"): [
+        "g.id > :after",
+        "g.id > :after AND g.category_id = :category_id AND g.price >= :min_price AND g.price <= :max_price",
+    ],
+    ("_recalc_orders_without_game", "scope"): ["", "AND order_id IN :oids"],
+    ("get_daily_top_selling_games", "order_col"): ["units", "revenue"],
+    ("backfill_daily_game_sales", "date_filter"): [
+        "",
+        "WHERE sale_date >= DATE_SUB(CURDATE(), INTERVAL :days_minus_one DAY)",
+    ],
+    ("backfill_daily_game_sales", "order_filter"): [
+        "",
+        "AND o.created_at >= DATE_SUB(CURDATE(), INTERVAL :days_minus_one DAY)",
+    ],
+    ("_update_user_simple", "set_clause"): ["username = :username, updated_at = :updated_at"],
+    ("purchase_games", "','.join([':g' + str(i) for i, _ in enumerate(game_ids)])"): [":g0,:g1,:g2"],
+    ("purchase_games", "','.join([':gg' + str(i) for i, _ in enumerate(game_ids)])"): [":gg0,:gg1,:gg2"],
+    ("update_discount_code", "', '.join(set_parts)"): ["value = :value, status = :status"],
+}
+
+_PARAM = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+_IN_PARAM = re.compile(r"\bIN\s+:([A-Za-z_]\w*)", re.IGNORECASE)
+
+
+@dataclass
+class Statement:
+    path: Path
+    lineno: int
+    function: str
+    renderings: list[str]
+    unrendered: list[str]
+
+
+def _render_arg(function: str, arg: ast.expr) -> tuple[list[str], list[str]]:
+    if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+        return [arg.value], []
+    if not isinstance(arg, ast.JoinedStr):
+        return [], [ast.unparse(arg)]
+
+    choices, missing = [], []
+    for part in arg.values:
+        if isinstance(part, ast.Constant):
+            choices.append([part.value])
+            continue
+        source = ast.unparse(part.value)
+        samples = SAMPLE_RENDERINGS.get((function, source))
+        if samples is None:
+            missing.append(source)
+            choices.append([""])
+        else:
+            choices.append(samples)
+    return ["".join(combo) for combo in itertools.product(*choices)], missing
+
+
+def collect_statements(paths: list[Path]) -> list[Statement]:
+    found = []
+    for path in paths:
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for func in ast.walk(tree):
+            if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            for node in ast.walk(func):
+                if not (isinstance(node, ast.Call) and getattr(node.func, "id", None) == "text" and node.args):
+                    continue
+                renderings, unrendered = _render_arg(func.name, node.args[0])
+                found.append(Statement(path, node.lineno, func.name, renderings, unrendered))
+
+    # ฟังก์ชันซ้อน (เช่น lambda ใน def) ถูกเก็บซ้ำได้ เก็บครั้งแรกพอ
+    unique = {}
+    for st in found:
+        unique.setdefault((st.path, st.lineno), st)
+    return list(unique.values())
+
+
+def render(sql: str) -> str:
+    sql = _IN_PARAM.sub("IN (1)", sql)
+    return _PARAM.sub("1", sql).strip().rstrip(";")
+
+
+def is_explainable(sql: str) -> bool:
+    head = " ".join(sql.split()).upper()
+    if head.startswith("INSERT"):
+        return " SELECT " in head and " VALUES " not in head
+    return head.startswith(("SELECT", "UPDATE", "DELETE", "WITH"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN every SQL statement in app/crud")
+    parser.add_argument("--strict", action="store_true", help="fail ทุก full scan แม้มี possible_keys")
+    parser.add_argument("paths", nargs="*", type=Path, help="ไฟล์ที่ต้องการตรวจ (ค่าเริ่มต้น app/crud, app/services)")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(p for g in DEFAULT_GLOBS for p in ROOT.glob(g))
+    statements = collect_statements(paths)
+
+    failures, checked = [], 0
+    with engine.connect() as conn:
+        for st in statements:
+            where = f"{st.path.relative_to(ROOT.parent)}:{st.lineno} ({st.function})"
+            if st.unrendered:
+                failures.append(f"{where}: dynamic SQL without SAMPLE_RENDERINGS for {st.unrendered}")
+                continue
+
+            for variant, sql in enumerate(st.renderings, start=1):
+                if not is_explainable(sql):
+                    continue
+                label = f"{where} #{variant}" if len(st.renderings) > 1 else where
+
+                try:
+                    plan = conn.execute(text("EXPLAIN " + render(sql))).mappings().all()
+                except Exception as e:
+                    failures.append(f"{label}: EXPLAIN error: {e.__class__.__name__}: {e}")
+                    conn.rollback()
+                    continue
+                checked += 1
+
+                for row in plan:
+                    table = row.get("table") or ""
+                    if row.get("type") != "ALL" or table.startswith("<"):
+                        continue
+                    if st.function in ALLOW_FULL_SCAN:
+                        continue
+                    if args.strict or not row.get("possible_keys"):
+                        failures.append(
+                            f"{label}: full scan on {table} (rows={row.get('rows')}, possible_keys={row.get('possible_keys')})"
+                        )
+
+    print(f"checked {checked} statements, failures {len(failures)}")
+    for line in failures:
+        print(f"  FAIL  {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+ลบรูปใน storage ที่ไม่มีเกม/ผู้ใช้อ้างถึงแล้ว (รูปเก่าหลังเปลี่ยนรูป, รูปของเกมที่ถูกลบ)
+
+    python -m app.scripts.gc_images                     # dry-run: แสดงรายการที่จะลบ
+    python -m app.scripts.gc_images --apply             # ลบจริง
+    python -m app.scripts.gc_images --apply --grace-hours 72 --batch-size 50 --rate 1
+"""
+import argparse
+
+from app.db.database import SessionLocal
+from app.services.storage_gc import collect_orphans
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delete orphaned images from the storage bucket")
+    parser.add_argument("--apply", action="store_true", help="ลบจริง (ค่าเริ่มต้นเป็น dry-run)")
+    parser.add_argument("--grace-hours", type=int, default=None, help="ไม่ลบไฟล์ที่อายุน้อยกว่านี้")
+    parser.add_argument("--batch-size", type=int, default=None, help="จำนวน key ต่อคำสั่งลบ")
+    parser.add_argument("--rate", type=float, default=2.0, help="จำนวน batch สูงสุดต่อวินาที")
+    parser.add_argument("--verbose", "-v", action="store_true", help="แสดง key ที่เป็น orphan ทั้งหมด")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = collect_orphans(
+            db,
+            dry_run=not args.apply,
+            grace_hours=args.grace_hours,
+            batch_size=args.batch_size,
+            max_batches_per_sec=args.rate,
+        )
+    finally:
+        db.close()
+
+    if args.verbose or report.dry_run:
+        for key in report.orphans:
+            print(key)
+    print(
+        f"scanned={report.scanned} referenced={report.referenced} "
+        f"too_young={report.too_young} orphans={len(report.orphans)} "
+        f"rescued={report.rescued} deleted={report.deleted}{' (dry-run)' if report.dry_run else ''}"
+    )
+
+
+if __name__ == "__main__":
+    main()
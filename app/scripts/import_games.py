@@ -0,0 +1,37 @@
+"""
+นำเข้าเกมจากไฟล์ CSV/NDJSON
+
+    python -m app.scripts.import_games games.csv --images images.zip
+    python -m app.scripts.import_games games.ndjson --dry-run
+
+คอลัมน์: name, category_id, description, price และ image_url หรือ image (ชื่อไฟล์ใน zip)
+"""
+import argparse
+import json
+from pathlib import Path
+
+from app.db.database import SessionLocal
+from app.services import import_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import games")
+    parser.add_argument("file", type=Path, help="ไฟล์ CSV หรือ NDJSON")
+    parser.add_argument("--images", type=Path, default=None, help="ไฟล์ zip ของรูปเกม")
+    parser.add_argument("--dry-run", action="store_true", help="ตรวจสอบอย่างเดียว ไม่อัปโหลด/ไม่บันทึก")
+    args = parser.parse_args()
+
+    rows = import_service.parse_game_file(args.file.read_bytes(), args.file.name)
+    archive = import_service.load_image_archive(args.images.read_bytes()) if args.images else None
+
+    db = SessionLocal()
+    try:
+        report = import_service.import_games(db, rows, archive, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+ลบ Idempotency-Key ที่หมดอายุแล้ว (ตั้งเป็น cron รายชั่วโมง/รายวัน)
+
+    python -m app.scripts.purge_idempotency_keys
+"""
+from app.crud.idempotency import purge_expired_idempotency_keys
+from app.db.database import SessionLocal
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        rows = purge_expired_idempotency_keys(db)
+    finally:
+        db.close()
+
+    print(f"idempotency_keys: ลบ {rows} แถวที่หมดอายุ")
+
+
+if __name__ == "__main__":
+    main()
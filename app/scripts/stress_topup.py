@@ -0,0 +1,106 @@
+"""
+stress test การเติมเงินพร้อมกัน: ยอดสุดท้ายต้องเท่ากับผลรวมที่เติมพอดี (ไม่มี lost update)
+
+สร้างผู้ใช้ชั่วคราว เติมเงิน --count ครั้งพร้อมกัน --concurrency thread แล้วลบทิ้ง
+ใช้กับฐานข้อมูล dev/staging เท่านั้น
+
+    python -m app.scripts.stress_topup
+    python -m app.scripts.stress_topup --count 1000 --min-rps 200
+"""
+import argparse
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import text
+
+from app.crud.wallet import add_balance
+from app.db.database import SessionLocal
+
+
+def _create_user() -> int:
+    db = SessionLocal()
+    try:
+        email = f"stress-{uuid.uuid4().hex[:12]}@example.invalid"
+        db.execute(
+            text("""
+                INSERT INTO users (username, email, password_hash, img_url, role, wallet_balance, created_at, updated_at)
+                VALUES (:username, :email, '!', '', 'USER', 0, :now, :now)
+            """),
+            {"username": "stress-topup", "email": email, "now": datetime.now()}
+        )
+        db.commit()
+        return db.execute(text("SELECT id FROM users WHERE email = :email"), {"email": email}).scalar_one()
+    finally:
+        db.close()
+
+
+def _drop_user(user_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(text("DELETE FROM transactions WHERE user_id = :id"), {"id": user_id})
+        db.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+        db.commit()
+    finally:
+        db.close()
+
+
+def _topup(user_id: int, amount: Decimal) -> None:
+    db = SessionLocal()
+    try:
+        add_balance(db, user_id, float(amount))
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent wallet top-up stress test")
+    parser.add_argument("--count", type=int, default=500, help="จำนวนครั้งที่เติมเงิน")
+    parser.add_argument("--concurrency", type=int, default=15, help="จำนวน thread พร้อมกัน (engine มี pool_size + max_overflow = 15 connection)")
+    parser.add_argument("--amount", type=Decimal, default=Decimal("1.25"), help="ยอดต่อครั้ง")
+    parser.add_argument("--min-rps", type=float, default=0.0, help="fail ถ้า throughput ต่ำกว่านี้")
+    parser.add_argument("--keep", action="store_true", help="ไม่ลบผู้ใช้ทดสอบหลังจบ")
+    args = parser.parse_args()
+
+    user_id = _create_user()
+    try:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for f in [pool.submit(_topup, user_id, args.amount) for _ in range(args.count)]:
+                f.result()
+        elapsed = time.perf_counter() - t0
+
+        db = SessionLocal()
+        try:
+            balance = Decimal(str(db.execute(text("SELECT wallet_balance FROM users WHERE id = :id"), {"id": user_id}).scalar_one()))
+            topups = db.execute(
+                text("SELECT COUNT(*) FROM transactions WHERE user_id = :id AND type = 'topup'"), {"id": user_id}
+            ).scalar_one()
+        finally:
+            db.close()
+    finally:
+        if not args.keep:
+            _drop_user(user_id)
+
+    expected = args.amount * args.count
+    rps = args.count / elapsed
+    print(f"user={user_id} topups={topups}/{args.count} balance={balance} expected={expected}")
+    print(f"{elapsed:.2f}s, {rps:.1f} top-ups/s at concurrency {args.concurrency}")
+
+    failures = []
+    if balance != expected:
+        failures.append(f"balance mismatch: {balance} != {expected}")
+    if topups != args.count:
+        failures.append(f"transaction rows: {topups} != {args.count}")
+    if rps < args.min_rps:
+        failures.append(f"throughput {rps:.1f}/s below --min-rps {args.min_rps}")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,28 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from app.crud.user import get_user_by_email
-from app.core.security import verify_password
+from app.crud.user import get_user_by_email, set_password_hash
+from app.core.security import verify_and_update_password
+from app.core.tokens import create_access_token
+from app.services.login_throttle import login_throttle
+
+def login_plain(db: Session, email: str, password: str, client_ip: str | None = None) -> dict:
+    # ถูกบล็อกอยู่: ตอบ 429 ก่อนแตะ DB หรือ Argon2
+    login_throttle.check(email, client_ip)
 
-def login_plain(db: Session, email: str, password: str) -> dict:
     user = get_user_by_email(db, email)
     if not user:
+        login_throttle.record_failure(email, client_ip)
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
-    if not verify_password(password, user["password_hash"]):
+    ok, new_hash = verify_and_update_password(password, user["password_hash"])
+    if not ok:
+        login_throttle.record_failure(email, client_ip)
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    login_throttle.record_success(email, client_ip)
+
+    # hash เดิมใช้ค่า cost เก่า: เก็บ hash ใหม่ตอนที่มีรหัสผ่านจริงอยู่ในมือ
+    if new_hash:
+        set_password_hash(db, user["id"], new_hash)
 
-    return user
+    access_token, expires_in = create_access_token(user["id"], user["role"])
+    return {**user, "access_token": access_token, "token_type": "bearer", "expires_in": expires_in}
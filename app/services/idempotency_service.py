@@ -0,0 +1,116 @@
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud import idempotency as crud_idem
+
+MAX_KEY_LENGTH = 100
+
+# ผลลัพธ์ที่เสร็จแล้ว: retry ที่ตามมาไม่ต้องถาม DB (cache สั้นกว่า IDEMPOTENCY_TTL ในตาราง)
+_completed = TTLCache(maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=min(600, settings.IDEMPOTENCY_TTL))
+
+
+def request_fingerprint(endpoint: str, params: dict) -> str:
+    raw = json.dumps({"endpoint": endpoint, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _in_progress() -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail="request ที่ใช้ Idempotency-Key นี้กำลังทำงานอยู่",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _replay(endpoint: str, request_hash: str, stored_endpoint: str, stored_hash: str, body: Any, response: Response) -> Any:
+    if stored_endpoint != endpoint or stored_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key นี้ถูกใช้กับ request อื่นแล้ว")
+    response.headers["Idempotent-Replayed"] = "true"
+    return body
+
+
+def run_idempotent(
+    db: Session,
+    response: Response,
+    user_id: int,
+    key: str | None,
+    endpoint: str,
+    params: dict,
+    fn: Callable[[Callable[[Any], None] | None], Any],
+    render: Callable[[Any], Any] = lambda result: result,
+) -> Any:
+    """
+    รัน fn ครั้งเดียวต่อ (user_id, Idempotency-Key)
+
+    fn(before_commit) ต้องเรียก before_commit(result) ก่อน commit ของตัวเอง:
+    ผลลัพธ์ (render(result)) ถูกบันทึกใน transaction เดียวกับการซื้อ/เติมเงิน
+    จึงไม่มีกรณีเงินถูกตัดแล้วแต่ key ยังค้าง pending
+
+    request ซ้ำที่มาหลังทำเสร็จจะได้ผลลัพธ์เดิมโดยไม่เข้า transaction ซื้อ/เติมเงินอีก
+    ถ้าอันแรกยังทำไม่เสร็จ ตอบ 409; pending ที่ค้างเกิน IDEMPOTENCY_PENDING_TIMEOUT
+    (request แรกตายก่อน commit) จะถูก retry รับช่วงไปทำใหม่
+    """
+    if key is None:
+        return render(fn(None))
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key ต้องยาว 1-{MAX_KEY_LENGTH} ตัวอักษร")
+
+    request_hash = request_fingerprint(endpoint, params)
+    cached = _completed.get((user_id, key))
+    if cached is not None:
+        return _replay(endpoint, request_hash, *cached, response)
+
+    owner = uuid.uuid4().hex
+    for _ in range(2):
+        if crud_idem.reserve_idempotency_key(db, user_id, key, endpoint, request_hash, owner, settings.IDEMPOTENCY_TTL):
+            break
+        row = crud_idem.get_idempotency_key(db, user_id, key)
+        if row is None:
+            continue  # ถูกลบไประหว่างนั้น (request แรก error): จองใหม่
+        if row["expires_at"] <= datetime.now():
+            crud_idem.delete_expired_idempotency_key(db, user_id, key)
+            continue
+        if row["status"] == "done":
+            body = json.loads(row["response_body"])
+            _completed.set((user_id, key), (row["endpoint"], row["request_hash"], body))
+            return _replay(endpoint, request_hash, row["endpoint"], row["request_hash"], body, response)
+
+        stale_before = datetime.now() - timedelta(seconds=settings.IDEMPOTENCY_PENDING_TIMEOUT)
+        if (
+            row["endpoint"] == endpoint
+            and row["request_hash"] == request_hash
+            and row["created_at"] <= stale_before
+            and crud_idem.take_over_idempotency_key(db, user_id, key, row["owner"], owner)
+        ):
+            break
+        raise _in_progress()
+    else:
+        raise _in_progress()
+
+    stored: dict = {}
+
+    def before_commit(result: Any) -> None:
+        body = jsonable_encoder(render(result))
+        # rowcount 0 = การจองถูก request อื่นรับช่วงไปแล้ว: ยกเลิกทั้ง transaction (ไม่ตัดเงินซ้ำ)
+        if not crud_idem.complete_idempotency_key(db, user_id, key, owner, json.dumps(body)):
+            raise _in_progress()
+        stored["body"] = body
+
+    try:
+        result = fn(before_commit)
+    except BaseException:
+        crud_idem.release_idempotency_key(db, user_id, key, owner)
+        raise
+
+    body = stored["body"]
+    _completed.set((user_id, key), (endpoint, request_hash, body))
+    return body
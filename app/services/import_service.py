@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+import mimetypes
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import game as crud_game
+from app.schemas.game import GameImportRow
+from app.services.upload_service import upload_game_image
+
+ALLOWED_IMAGE_TYPES = {"image/png", "image/jpeg"}
+
+
+def parse_game_file(content: bytes, filename: str = "") -> list[dict]:
+    text_ = content.decode("utf-8-sig")
+    is_ndjson = filename.lower().endswith((".ndjson", ".jsonl")) or text_.lstrip().startswith("{")
+
+    if is_ndjson:
+        rows = []
+        for lineno, line in enumerate(text_.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                rows.append({"__error__": f"บรรทัด {lineno}: JSON ไม่ถูกต้อง ({e.msg})"})
+                continue
+            if not isinstance(row, dict):
+                rows.append({"__error__": f"บรรทัด {lineno}: ต้องเป็น JSON object"})
+                continue
+            rows.append(row)
+        return rows
+
+    return [dict(r) for r in csv.DictReader(io.StringIO(text_))]
+
+
+def _read_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int) -> bytes:
+    # อ่านทีละ chunk และตัดเมื่อเกิน limit: file_size ใน header ของ zip ปลอมได้ (zip bomb)
+    buf = bytearray()
+    with zf.open(info) as member:
+        while chunk := member.read(64 * 1024):
+            buf += chunk
+            if len(buf) > limit:
+                raise ValueError(f"ไฟล์ '{info.filename}' ใหญ่เกิน {limit} ไบต์")
+    return bytes(buf)
+
+
+def load_image_archive(content: bytes) -> dict[str, bytes]:
+    images = {}
+    total = 0
+    with zipfile.ZipFile(io.BytesIO(content)) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            if info.file_size > settings.MAX_UPLOAD_BYTES:
+                raise ValueError(f"ไฟล์ '{info.filename}' ใหญ่เกิน {settings.MAX_UPLOAD_BYTES} ไบต์")
+            data = _read_member(zf, info, settings.MAX_UPLOAD_BYTES)
+            total += len(data)
+            if total > settings.IMPORT_ARCHIVE_MAX_BYTES:
+                raise ValueError(f"ขนาดรวมของรูปใน archive เกิน {settings.IMPORT_ARCHIVE_MAX_BYTES} ไบต์")
+            images[info.filename.rsplit("/", 1)[-1]] = data
+    return images
+
+
+def _upload_one(filename: str, data: bytes) -> str:
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    if content_type not in ALLOWED_IMAGE_TYPES:
+        raise ValueError("อนุญาตเฉพาะภาพ PNG/JPEG")
+    return upload_game_image(file_bytes=data, content_type=content_type)
+
+
+def import_games(
+    db: Session,
+    raw_rows: list[dict],
+    images: Optional[dict[str, bytes]] = None,
+    dry_run: bool = False,
+) -> dict:
+    """
+    นำเข้าเกมจำนวนมากในครั้งเดียว
+    - validate ทุกแถว, เช็คชื่อซ้ำทั้งในไฟล์และในฐานข้อมูล (query เดียว)
+    - อัปโหลดรูปจาก archive พร้อมกันหลาย thread
+    - insert แบบ executemany เป็นชุดๆ ภายใน transaction เดียว
+    แถวที่ไม่ผ่านจะถูกข้ามและรายงานใน errors
+    """
+    images = images or {}
+    errors: dict[int, list[str]] = {}
+    valid: dict[int, GameImportRow] = {}
+
+    for i, raw in enumerate(raw_rows, start=1):
+        if "__error__" in raw:
+            errors[i] = [raw["__error__"]]
+            continue
+        try:
+            row = GameImportRow.model_validate({k: v for k, v in raw.items() if v not in ("", None)})
+        except ValidationError as e:
+            errors[i] = [
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"]
+                for err in e.errors()
+            ]
+            continue
+        if row.image and row.image not in images:
+            errors[i] = [f"ไม่พบไฟล์รูป '{row.image}' ใน archive"]
+            continue
+        valid[i] = row
+
+    seen: dict[str, int] = {}
+    for i, row in list(valid.items()):
+        key = row.name.casefold()
+        if key in seen:
+            errors.setdefault(i, []).append(f"ชื่อเกมซ้ำกับแถวที่ {seen[key]}")
+            del valid[i]
+        else:
+            seen[key] = i
+
+    existing = crud_game.get_existing_game_names(db, [r.name for r in valid.values()])
+    known_categories = crud_game.get_existing_category_ids(db, {r.category_id for r in valid.values()})
+    for i, row in list(valid.items()):
+        if row.name.casefold() in existing:
+            errors.setdefault(i, []).append("ชื่อเกมนี้ถูกใช้แล้ว")
+            del valid[i]
+        elif row.category_id not in known_categories:
+            errors.setdefault(i, []).append(f"ไม่พบประเภทเกม id={row.category_id}")
+            del valid[i]
+
+    image_urls: dict[int, str] = {i: r.image_url for i, r in valid.items() if r.image_url}
+    if not dry_run:
+        pending = {i: r.image for i, r in valid.items() if r.image}
+        with ThreadPoolExecutor(max_workers=settings.IMPORT_UPLOAD_WORKERS) as pool:
+            futures = {i: pool.submit(_upload_one, name, images[name]) for i, name in pending.items()}
+            for i, fut in futures.items():
+                try:
+                    image_urls[i] = fut.result()
+                except Exception as e:
+                    errors.setdefault(i, []).append(f"อัปโหลดรูปไม่สำเร็จ: {e}")
+                    del valid[i]
+
+    inserted = 0
+    if valid and not dry_run:
+        inserted = crud_game.bulk_insert_games(
+            db,
+            [{**r.model_dump(exclude={"image", "image_url"}), "image_url": image_urls[i]} for i, r in valid.items()],
+        )
+
+    return {
+        "total": len(raw_rows),
+        "valid": len(valid),
+        "inserted": inserted,
+        "dry_run": dry_run,
+        "errors": [{"row": i, "errors": errs} for i, errs in sorted(errors.items())],
+    }
@@ -0,0 +1,85 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class JobRegistry:
+    """รันงานที่ใช้เวลานานใน thread pool แยก และเก็บสถานะไว้ให้ถามผลภายหลัง
+
+    เก็บสถานะงานล่าสุดไม่เกิน max_jobs งาน (งานเก่าสุดที่จบแล้วจะถูกลบก่อน)
+    สถานะอยู่ใน memory ของ process ที่รับงาน: ถ้ารันหลาย worker ต้องถามผลจาก worker เดิม
+    (เช่น sticky session) ไม่อย่างนั้นจะได้ 404
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._pool: ThreadPoolExecutor | None = None
+        self._max_workers = max_workers
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="job")
+            return self._pool
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args, **kwargs) -> dict:
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "pending",
+            "result": None,
+            "error": None,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "finished_at": None,
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            while len(self._jobs) > self.max_jobs:
+                oldest = next((k for k, j in self._jobs.items() if j["status"] in ("done", "failed")), None)
+                if oldest is None:
+                    break
+                del self._jobs[oldest]
+
+        self._executor().submit(self._run, job, fn, args, kwargs)
+        return dict(job)
+
+    def _run(self, job: dict, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        job["status"] = "running"
+        try:
+            job["result"] = fn(*args, **kwargs)
+            job["status"] = "done"
+        except HTTPException as e:
+            job["error"] = {"status_code": e.status_code, "detail": e.detail}
+            job["status"] = "failed"
+        except Exception:
+            # รายละเอียด/traceback อยู่ใน log ของ server เท่านั้น (endpoint สถานะงานไม่มี auth)
+            logger.exception("job %s (%s) failed", job["id"], job["kind"])
+            job["error"] = {"status_code": 500, "detail": "Internal Server Error"}
+            job["status"] = "failed"
+        finally:
+            job["finished_at"] = datetime.now().isoformat(timespec="seconds")
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+jobs = JobRegistry(max_workers=settings.JOB_WORKERS)
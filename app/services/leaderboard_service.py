@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Hashable
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.crud import game as crud_game
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshingCache:
+    """cache ผลลัพธ์ที่คำนวณหนัก พร้อม refresh เบื้องหลังแบบ single-flight
+
+    - ค่าที่หมดอายุยังถูกส่งกลับทันที แล้วค่อยคำนวณใหม่เบื้องหลัง (stale-while-revalidate)
+    - แต่ละ key มีการคำนวณที่กำลังทำอยู่ได้ไม่เกินหนึ่งงาน request ที่มาพร้อมกันจะรอผลเดียวกัน
+    - run() refresh เฉพาะ key ที่ถูกอ่านในรอบที่ผ่านมา (และ warm key) key ที่ไม่มีใครอ่าน
+      เกิน idle_intervals รอบจะถูกทิ้ง; คำนวณพร้อมกันได้ไม่เกิน max_concurrency งาน
+      เพื่อไม่ให้กิน thread pool / DB connection ของ request อื่น
+    ทุก method ต้องเรียกจาก event loop เดียวกัน จึงไม่ต้องใช้ lock
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Hashable], Any],
+        ttl: float,
+        refresh_interval: float,
+        max_keys: int = 32,
+        max_concurrency: int = 2,
+        idle_intervals: int = 5,
+    ):
+        self._loader = loader
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.max_keys = max_keys
+        self.idle_intervals = idle_intervals
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._last_read: dict[Hashable, float] = {}
+        self._pinned: set[Hashable] = set()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.dropped = 0
+
+    async def get(self, key: Hashable) -> Any:
+        self._last_read[key] = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            computed_at, value = entry
+            if time.monotonic() - computed_at > self.ttl:
+                self.stale_hits += 1
+                self._refresh(key)
+            else:
+                self.hits += 1
+            return value
+
+        self.misses += 1
+        return await asyncio.shield(self._refresh(key))
+
+    def _refresh(self, key: Hashable) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return task
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None and key in self._entries:
+            logger.warning("refresh %r failed, serving stale value: %s", key, task.exception())
+
+    async def _compute(self, key: Hashable) -> Any:
+        async with self._slots:
+            value = await run_in_threadpool(self._loader, key)
+        self.refreshes += 1
+        self._entries[key] = (time.monotonic(), value)
+        self._last_read.setdefault(key, time.monotonic())
+        while len(self._entries) > self.max_keys:
+            # ทิ้ง key ที่ไม่ได้ถูกอ่านนานที่สุด (ยกเว้น warm key)
+            victim = min(
+                (k for k in self._entries if k not in self._pinned),
+                key=lambda k: self._last_read.get(k, 0.0),
+                default=None,
+            )
+            if victim is None:
+                break
+            self._drop(victim)
+        return value
+
+    def _drop(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        self._last_read.pop(key, None)
+        self.dropped += 1
+
+    def _sweep(self) -> list[Hashable]:
+        # คืน key ที่ควร refresh รอบนี้ และทิ้ง key ที่ไม่มีใครอ่านนานเกินไป
+        now = time.monotonic()
+        due = []
+        for key in list(self._entries):
+            idle = now - self._last_read.get(key, 0.0)
+            if key in self._pinned or idle <= self.refresh_interval:
+                due.append(key)
+            elif idle > self.refresh_interval * self.idle_intervals:
+                self._drop(key)
+        return due
+
+    async def run(self, warm_keys: tuple[Hashable, ...] = ()) -> None:
+        self._pinned.update(warm_keys)
+        for key in warm_keys:
+            self._refresh(key)
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            tasks = [self._refresh(key) for key in self._sweep()]
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "dropped": self.dropped,
+        }
+
+
+def _load_top_selling(key: tuple[int, int, str]) -> list[dict]:
+    days, top_n, order_by = key
+    db = SessionLocal()
+    try:
+        return crud_game.get_daily_top_selling_games(db, days=days, top_n=top_n, order_by=order_by)
+    finally:
+        db.close()
+
+
+top_selling_cache = RefreshingCache(
+    _load_top_selling,
+    ttl=settings.LEADERBOARD_TTL,
+    refresh_interval=settings.LEADERBOARD_REFRESH_SECONDS,
+)
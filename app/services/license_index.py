@@ -0,0 +1,94 @@
+import bisect
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+def _contains(arr: array, value: int) -> bool:
+    i = bisect.bisect_left(arr, value)
+    return i < len(arr) and arr[i] == value
+
+
+class LicenseIndex:
+    """ดัชนีเกมที่ผู้ใช้เป็นเจ้าของ เก็บเป็น array ของ game_id ที่เรียงแล้ว (8 ไบต์ต่อเกม)
+
+    - โหลดจาก user_game_licenses เมื่อถูกถามครั้งแรก (lazy) และเก็บแบบ LRU ไม่เกิน max_users คน
+    - purchase เพิ่ม game_id เข้า array ที่โหลดอยู่แล้วโดยตรง ไม่ต้องโหลดใหม่
+    - แต่ละ array มีอายุ ttl วินาที: การซื้อที่ worker อื่นจะเห็นภายในเวลานี้
+    generation ใช้กันไม่ให้ array ที่โหลดก่อนการซื้อถูกเก็บทับข้อมูลใหม่
+    """
+
+    def __init__(self, max_users: int = 50000, ttl: float = 600.0):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._users: "OrderedDict[int, tuple[float, array]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def _load(self, db: Session, user_id: int) -> array:
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None:
+                if entry[0] >= time.monotonic():
+                    self._users.move_to_end(user_id)
+                    self.hits += 1
+                    return entry[1]
+                del self._users[user_id]
+            generation = self._generation
+
+        ids = db.execute(
+            text("SELECT game_id FROM user_game_licenses WHERE user_id = :uid ORDER BY game_id"),
+            {"uid": user_id}
+        ).scalars().all()
+        arr = array("q", sorted(set(int(g) for g in ids)))
+
+        with self._lock:
+            self.loads += 1
+            if generation == self._generation:
+                self._users[user_id] = (time.monotonic() + self.ttl, arr)
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+        return arr
+
+    def owned(self, db: Session, user_id: int, game_ids: Iterable[int]) -> list[bool]:
+        arr = self._load(db, user_id)
+        return [_contains(arr, int(gid)) for gid in game_ids]
+
+    def add(self, user_id: int, game_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._generation += 1
+            entry = self._users.get(user_id)
+            if entry is None:
+                return
+            arr = entry[1]
+            for gid in game_ids:
+                if not _contains(arr, int(gid)):
+                    bisect.insort(arr, int(gid))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._users.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "max_users": self.max_users,
+                "ttl": self.ttl,
+                "licenses": sum(len(a) for _, a in self._users.values()),
+                "hits": self.hits,
+                "loads": self.loads,
+            }
+
+
+license_index = LicenseIndex(max_users=settings.LICENSE_INDEX_USERS, ttl=settings.LIBRARY_CACHE_TTL)
@@ -0,0 +1,171 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+
+@dataclass
+class ThrottleState:
+    failures: deque = field(default_factory=deque)
+    blocked_until: float = 0.0
+    strikes: int = 0
+
+
+class ThrottleBackend(ABC):
+    """ที่เก็บสถานะ throttle ต่อ key
+
+    memory = ต่อ process; ถ้ารันหลาย worker แล้วต้องการนับรวมกัน
+    ให้ implement interface นี้บน store กลาง (เช่น Redis) แล้วเลือกผ่าน LOGIN_THROTTLE_BACKEND
+    """
+
+    @abstractmethod
+    def blocked_until(self, key: str) -> float: ...
+
+    @abstractmethod
+    def record_failure(self, key: str, now: float, limit: int) -> float:
+        """บันทึกความล้มเหลว คืนเวลาที่ถูกบล็อกถึง (0 = ยังไม่บล็อก)"""
+
+    @abstractmethod
+    def reset(self, key: str) -> None: ...
+
+    @abstractmethod
+    def stats(self) -> dict: ...
+
+
+class MemoryThrottleBackend(ThrottleBackend):
+    def __init__(self, window: float, lockout_base: float, lockout_max: float, max_keys: int):
+        self.window = window
+        self.lockout_base = lockout_base
+        self.lockout_max = lockout_max
+        self.max_keys = max_keys
+        self.evictions = 0
+        self.lockouts = 0
+        self._data: "OrderedDict[str, ThrottleState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def blocked_until(self, key: str) -> float:
+        with self._lock:
+            state = self._data.get(key)
+            return state.blocked_until if state else 0.0
+
+    def record_failure(self, key: str, now: float, limit: int) -> float:
+        with self._lock:
+            state = self._data.get(key)
+            if state is None:
+                state = self._data[key] = ThrottleState()
+                # จำกัดจำนวน key: ทิ้ง key ที่ไม่มีความเคลื่อนไหวนานที่สุด
+                while len(self._data) > self.max_keys:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+            self._data.move_to_end(key)
+
+            # เงียบมานานพอหลังโดนบล็อกครั้งล่าสุด: เริ่ม backoff ใหม่
+            if state.strikes and now > state.blocked_until + self.lockout_max:
+                state.strikes = 0
+
+            failures = state.failures
+            while failures and failures[0] <= now - self.window:
+                failures.popleft()
+            failures.append(now)
+
+            if len(failures) >= limit:
+                lockout = min(self.lockout_base * (2 ** state.strikes), self.lockout_max)
+                state.blocked_until = now + lockout
+                state.strikes += 1
+                failures.clear()
+                self.lockouts += 1
+            return state.blocked_until if state.blocked_until > now else 0.0
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            blocked = sum(1 for s in self._data.values() if s.blocked_until > now)
+            return {
+                "tracked_keys": len(self._data),
+                "max_keys": self.max_keys,
+                "blocked_keys": blocked,
+                "lockouts": self.lockouts,
+                "evictions": self.evictions,
+            }
+
+
+class LoginThrottle:
+    """จำกัดการ login ผิดต่อ email และต่อ IP (sliding window + exponential backoff)
+
+    check() เรียกก่อนอ่าน DB / hash รหัสผ่าน จึงไม่เสีย CPU กับ request ที่ถูกบล็อก
+    """
+
+    def __init__(self, backend: ThrottleBackend, max_per_email: int, max_per_ip: int):
+        self.backend = backend
+        self.max_per_email = max_per_email
+        self.max_per_ip = max_per_ip
+        self.checked = 0
+        self.rejected = 0
+        self.failures = 0
+
+    @staticmethod
+    def _keys(email: str, client_ip: str | None) -> list[tuple[str, str]]:
+        keys = [("email", f"email:{email.strip().lower()}")]
+        if client_ip:
+            keys.append(("ip", f"ip:{client_ip}"))
+        return keys
+
+    def _limit(self, kind: str) -> int:
+        return self.max_per_email if kind == "email" else self.max_per_ip
+
+    def check(self, email: str, client_ip: str | None) -> None:
+        self.checked += 1
+        now = time.time()
+        until = max(self.backend.blocked_until(key) for _, key in self._keys(email, client_ip))
+        if until > now:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many failed login attempts, please try again later",
+                headers={"Retry-After": str(int(until - now) + 1)},
+            )
+
+    def record_failure(self, email: str, client_ip: str | None) -> None:
+        self.failures += 1
+        now = time.time()
+        for kind, key in self._keys(email, client_ip):
+            self.backend.record_failure(key, now, self._limit(kind))
+
+    def record_success(self, email: str, client_ip: str | None) -> None:
+        # ล้างเฉพาะ email: IP เดียวกันอาจกำลังลองหลายบัญชี (credential stuffing)
+        self.backend.reset(self._keys(email, None)[0][1])
+
+    def stats(self) -> dict:
+        return {
+            "checked": self.checked,
+            "rejected": self.rejected,
+            "failures": self.failures,
+            **self.backend.stats(),
+        }
+
+
+def _make_backend() -> ThrottleBackend:
+    if settings.LOGIN_THROTTLE_BACKEND != "memory":
+        raise RuntimeError(f"unknown LOGIN_THROTTLE_BACKEND: {settings.LOGIN_THROTTLE_BACKEND}")
+    return MemoryThrottleBackend(
+        window=settings.LOGIN_THROTTLE_WINDOW,
+        lockout_base=settings.LOGIN_LOCKOUT_BASE,
+        lockout_max=settings.LOGIN_LOCKOUT_MAX,
+        max_keys=settings.LOGIN_THROTTLE_MAX_KEYS,
+    )
+
+
+login_throttle = LoginThrottle(
+    _make_backend(),
+    max_per_email=settings.LOGIN_MAX_FAILS_PER_EMAIL,
+    max_per_ip=settings.LOGIN_MAX_FAILS_PER_IP,
+)
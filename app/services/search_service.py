@@ -0,0 +1,148 @@
+import bisect
+import heapq
+import itertools
+import re
+import threading
+import time
+import unicodedata
+from typing import Iterable, Iterator
+
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize(value: str) -> str:
+    value = unicodedata.normalize("NFKC", value or "").casefold()
+    return " ".join(_NON_WORD.sub(" ", value).split())
+
+
+def trigrams(value: str) -> set[str]:
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+class GameSearchIndex:
+    """ดัชนีค้นหาชื่อเกมในหน่วยความจำ (token prefix + trigram)
+
+    - posting list ของแต่ละ token เรียงตามลำดับความเกี่ยวข้อง (ชื่อสั้นก่อน)
+      ทำให้ typeahead หยิบแค่ limit รายการแรกได้โดยไม่ต้องไล่ทุกเกม
+    - trigram ใช้หาเกมที่มีคำค้นอยู่กลางชื่อ (แทน LIKE '%kw%')
+    index ผูกกับ version ของ catalog_cache จึงถูกสร้างใหม่เมื่อมีการแก้ไข catalog
+    """
+
+    def __init__(self, max_age: float = 300.0):
+        self.max_age = max_age
+        self.version: int | None = None
+        self.built_at = 0.0
+        self._docs: dict[int, dict] = {}
+        self._names: dict[int, str] = {}
+        self._order: dict[int, tuple[int, int]] = {}
+        self._exact: dict[str, list[int]] = {}
+        self._postings: dict[str, list[int]] = {}
+        self._leading: dict[str, list[int]] = {}
+        self._trigrams: dict[str, set[int]] = {}
+        self._vocab: list[str] = []
+        self._lock = threading.Lock()
+
+    def is_fresh(self, version: int) -> bool:
+        return self.version == version and time.monotonic() - self.built_at < self.max_age
+
+    def build(self, rows: Iterable[dict], version: int) -> None:
+        docs: dict[int, dict] = {}
+        names: dict[int, str] = {}
+        order: dict[int, tuple[int, int]] = {}
+        exact: dict[str, list[int]] = {}
+        postings: dict[str, list[int]] = {}
+        leading: dict[str, list[int]] = {}
+        grams: dict[str, set[int]] = {}
+
+        for row in rows:
+            gid = int(row["id"])
+            name = normalize(row["name"])
+            docs[gid] = row
+            names[gid] = name
+            order[gid] = (len(name), gid)
+            exact.setdefault(name, []).append(gid)
+            words = name.split()
+            if words:
+                leading.setdefault(words[0], []).append(gid)
+            for tok in set(words):
+                postings.setdefault(tok, []).append(gid)
+            for g in trigrams(name):
+                grams.setdefault(g, set()).add(gid)
+
+        for ids in (*exact.values(), *postings.values(), *leading.values()):
+            ids.sort(key=order.__getitem__)
+
+        with self._lock:
+            self._docs, self._names, self._order = docs, names, order
+            self._exact, self._postings, self._leading = exact, postings, leading
+            self._trigrams = grams
+            self._vocab = sorted(postings)
+            self.version = version
+            self.built_at = time.monotonic()
+
+    def _vocab_range(self, prefix: str) -> list[str]:
+        vocab = self._vocab
+        lo = bisect.bisect_left(vocab, prefix)
+        hi = bisect.bisect_left(vocab, prefix + "\U0010ffff", lo)
+        return vocab[lo:hi]
+
+    def _substring_ids(self, query: str) -> set[int]:
+        postings = []
+        for g in trigrams(query):
+            ids = self._trigrams.get(g)
+            if not ids:
+                return set()
+            postings.append(ids)
+        postings.sort(key=len)
+        found = set(postings[0])
+        for ids in postings[1:]:
+            found &= ids
+            if not found:
+                break
+        return {gid for gid in found if query in self._names[gid]}
+
+    def _single_word(self, word: str) -> Iterator[int]:
+        key = self._order.__getitem__
+        toks = self._vocab_range(word)
+        yield from heapq.merge(*(self._leading.get(t, ()) for t in toks), key=key)
+        yield from heapq.merge(*(self._postings[t] for t in toks), key=key)
+
+    def _multi_word(self, words: list[str]) -> Iterator[int]:
+        # ไล่จากคำที่มีเกมน้อยที่สุดตามลำดับ แล้วตรวจคำที่เหลือกับ token ของแต่ละชื่อ
+        ranges = {w: self._vocab_range(w) for w in words}
+        pivot = min(words, key=lambda w: sum(len(self._postings[t]) for t in ranges[w]))
+        others = [w for w in words if w != pivot]
+
+        stream = heapq.merge(*(self._postings[t] for t in ranges[pivot]), key=self._order.__getitem__)
+        for gid in stream:
+            tokens = self._names[gid].split()
+            if all(any(tok.startswith(w) for tok in tokens) for w in others):
+                yield gid
+
+    def search(self, keyword: str, limit: int = 20) -> list[dict]:
+        query = normalize(keyword)
+        if not query:
+            return []
+
+        with self._lock:
+            words = query.split()
+            candidates = itertools.chain(
+                self._exact.get(query, ()),
+                self._single_word(query) if len(words) == 1 else self._multi_word(words),
+            )
+
+            ranked: list[int] = []
+            seen: set[int] = set()
+            for gid in candidates:
+                if gid not in seen:
+                    seen.add(gid)
+                    ranked.append(gid)
+                    if len(ranked) >= limit:
+                        break
+
+            # คำค้นที่อยู่กลางคำ เช่น "den" ใน "elden" ใช้ trigram เป็นอันดับสุดท้าย
+            if len(ranked) < limit and len(query) >= 3:
+                rest = self._substring_ids(query) - seen
+                ranked += heapq.nsmallest(limit - len(ranked), rest, key=self._order.__getitem__)
+
+            return [self._docs[gid] for gid in ranked]
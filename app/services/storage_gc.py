@@ -0,0 +1,99 @@
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.storage import StorageBackend, get_storage
+from app.utils.function import THUMBNAIL_SUFFIX, thumbnail_url
+
+# โฟลเดอร์ใน bucket ที่ upload_service เขียน
+GC_PREFIXES = ("avatars", "games")
+
+
+@dataclass
+class GCReport:
+    scanned: int = 0
+    referenced: int = 0
+    too_young: int = 0
+    rescued: int = 0
+    orphans: list[str] = field(default_factory=list)
+    deleted: int = 0
+    dry_run: bool = True
+
+
+def _referenced_keys(db: Session, storage: StorageBackend) -> set[str]:
+    keys: set[str] = set()
+    rows = db.execute(text("""
+        SELECT image_url FROM games WHERE image_url IS NOT NULL
+        UNION
+        SELECT img_url FROM users WHERE img_url IS NOT NULL
+    """)).scalars()
+    for url in rows:
+        key = storage.key_from_url(url)
+        if key:
+            keys.add(key)
+        # thumbnail ของรูปที่ยังใช้อยู่ต้องเก็บไว้ด้วย
+        thumb_key = storage.key_from_url(thumbnail_url(url))
+        if thumb_key:
+            keys.add(thumb_key)
+    return keys
+
+
+def collect_orphans(
+    db: Session,
+    *,
+    dry_run: bool = True,
+    grace_hours: int | None = None,
+    batch_size: int | None = None,
+    max_batches_per_sec: float = 2.0,
+    storage: StorageBackend | None = None,
+) -> GCReport:
+    """
+    ลบไฟล์ใน bucket ที่ไม่มี games.image_url / users.img_url อ้างถึงแล้ว
+    ไฟล์ที่อายุน้อยกว่า grace period จะไม่ถูกลบ (อาจกำลังอัปโหลดอยู่และยังไม่ได้บันทึก URL)
+    """
+    storage = storage or get_storage()
+    grace = timedelta(hours=settings.STORAGE_GC_GRACE_HOURS if grace_hours is None else grace_hours)
+    batch_size = batch_size or settings.STORAGE_GC_BATCH
+    cutoff = datetime.now(timezone.utc) - grace
+
+    # อ่าน reference หลังจาก list เสร็จ: ไฟล์ที่ถูกอ้างถึงระหว่าง scan จะไม่ถูกนับเป็น orphan
+    objects = [obj for prefix in GC_PREFIXES for obj in storage.list_objects(prefix)]
+    referenced = _referenced_keys(db, storage)
+
+    report = GCReport(dry_run=dry_run, scanned=len(objects))
+    for obj in objects:
+        if obj.key in referenced:
+            report.referenced += 1
+        elif obj.updated_at is None or obj.updated_at > cutoff:
+            report.too_young += 1
+        else:
+            report.orphans.append(obj.key)
+
+    if dry_run:
+        return report
+
+    # ลบรูปหลักก่อน thumbnail: ถ้ารูปหลักถูกอ้างถึงระหว่างทาง (ไม่ถูกลบ) thumbnail ของมันยังอยู่และถูกเก็บไว้ด้วย
+    # ถ้าหยุดกลางทาง thumbnail ที่เหลือเป็น orphan ที่ถูกลบในรอบถัดไป
+    orphans = sorted(report.orphans, key=lambda k: k.endswith(THUMBNAIL_SUFFIX))
+    interval = 1.0 / max_batches_per_sec if max_batches_per_sec > 0 else 0.0
+    for start in range(0, len(orphans), batch_size):
+        began = time.monotonic()
+        # อ่าน reference ใหม่ก่อนลบทุก batch: ระหว่างที่ลบอยู่ (อาจหลายนาที) ผู้ใช้อาจอัปโหลดไฟล์ที่เนื้อเหมือน orphan
+        # ได้ key เดิม (_put_once ข้ามการเขียน ไม่ต่ออายุ updated_at) แล้วบันทึก URL ลง DB ไปแล้ว
+        db.rollback()  # จบ transaction เดิม ให้เห็นแถวที่เพิ่ง commit
+        referenced = _referenced_keys(db, storage)
+        candidates = orphans[start:start + batch_size]
+        batch = [key for key in candidates if key not in referenced]
+        report.rescued += len(candidates) - len(batch)
+        if not batch:
+            continue
+        storage.delete(batch)
+        report.deleted += len(batch)
+        remaining = interval - (time.monotonic() - began)
+        if remaining > 0 and start + batch_size < len(orphans):
+            time.sleep(remaining)
+    return report
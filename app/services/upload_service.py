@@ -1,33 +1,121 @@
-import uuid
-from app.core.supabase_client import supabase
+import asyncio
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import BinaryIO
 
-def upload_avatar(file_bytes: bytes, filename: str, content_type: str) -> str:
-    BUCKET = "image_user" 
+from fastapi import HTTPException, UploadFile
+from PIL import Image
 
-    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else "bin"
-    key = f"avatars/{uuid.uuid4()}.{ext}"
+from app.core.config import settings
+from app.core.storage import get_storage
+from app.utils.function import THUMBNAIL_SUFFIX
+
+CHUNK_SIZE = 1024 * 1024
+THUMBNAIL_SIZE = 320
+# นามสกุลของ object มาจาก content type ที่ผ่านการตรวจแล้วเท่านั้น ไม่ใช้ชื่อไฟล์จาก client
+# (LocalStorage เสิร์ฟผ่าน StaticFiles ที่เดา MIME จากนามสกุล: x.html จะกลายเป็น text/html)
+IMAGE_EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg"}
+
+# storage client (เช่น Supabase) เป็นแบบ synchronous จึงรันใน thread pool ที่จำกัดจำนวนไว้ ไม่ให้บล็อก event loop
+_upload_pool = ThreadPoolExecutor(max_workers=settings.UPLOAD_WORKERS, thread_name_prefix="upload")
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"ไฟล์ต้องมีขนาดไม่เกิน {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+
+
+def read_file_chunks(file: BinaryIO) -> bytes:
+    buf = bytearray()
+    while chunk := file.read(CHUNK_SIZE):
+        buf += chunk
+        if len(buf) > settings.MAX_UPLOAD_BYTES:
+            raise _too_large()
+    return bytes(buf)
+
+
+async def read_upload(image_file: UploadFile) -> bytes:
+    buf = bytearray()
+    while chunk := await image_file.read(CHUNK_SIZE):
+        buf += chunk
+        if len(buf) > settings.MAX_UPLOAD_BYTES:
+            raise _too_large()
+    return bytes(buf)
+
+
+def _ext(content_type: str) -> str:
+    ext = IMAGE_EXTENSIONS.get(content_type)
+    if ext is None:
+        raise HTTPException(status_code=400, detail="อนุญาตเฉพาะภาพ PNG/JPEG")
+    return ext
+
+
+def _put_once(key: str, file_bytes: bytes, content_type: str) -> None:
+    # key มาจาก hash ของเนื้อไฟล์ ถ้ามีอยู่แล้วก็คือไฟล์เดียวกัน ไม่ต้องอัปโหลดซ้ำ
+    # เช็ค exists กับ storage ทุกครั้ง ไม่ cache ไว้ใน process: storage_gc (รันแยก process) อาจลบไฟล์ไปแล้ว
+    storage = get_storage()
+    if not storage.exists(key):
+        storage.put(key, file_bytes, content_type)
 
-    sb = supabase
-    sb.storage.from_(BUCKET).upload(
-        key,
-        file_bytes,
-        file_options={"content-type": content_type}
-    )
-    url = sb.storage.from_(BUCKET).get_public_url(key)
-    return url
 
-def upload_game_image(file_bytes: bytes, filename: str, content_type: str) -> str:
-    BUCKET = "image_user" 
+def make_thumbnail(file_bytes: bytes) -> tuple[bytes, str]:
+    try:
+        with Image.open(io.BytesIO(file_bytes)) as img:
+            img.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            out = io.BytesIO()
+            img.save(out, format="WEBP", quality=80, method=4)
+            return out.getvalue(), "image/webp"
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # อ่านรูปไม่ได้: ปฏิเสธการอัปโหลด ไม่เก็บไฟล์อื่นไว้ในชื่อ _thumb.webp
+        raise HTTPException(status_code=400, detail="ไฟล์รูปเสียหายหรือไม่ใช่รูปภาพที่รองรับ")
 
-    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else "bin"
-    key = f"games/{uuid.uuid4()}.{ext}"
 
-    sb = supabase
-    sb.storage.from_(BUCKET).upload(
-        key,
-        file_bytes,
-        file_options={"content-type": content_type}
+def _upload_content_addressed(prefix: str, file_bytes: bytes, content_type: str, thumbnail: bool) -> str:
+    digest = hashlib.sha256(file_bytes).hexdigest()
+    key = f"{prefix}/{digest}.{_ext(content_type)}"
+
+    # สร้าง thumbnail ก่อนเก็บรูปหลัก: ถ้ารูปเสียจะ 400 โดยไม่มีไฟล์ค้างใน bucket
+    thumb = None
+    if thumbnail:
+        thumb_key = f"{prefix}/{digest}{THUMBNAIL_SUFFIX}"
+        if not get_storage().exists(thumb_key):
+            thumb = make_thumbnail(file_bytes)
+
+    _put_once(key, file_bytes, content_type)
+    if thumb is not None:
+        _put_once(thumb_key, *thumb)
+
+    return get_storage().public_url(key)
+
+
+def upload_avatar(file_bytes: bytes, content_type: str) -> str:
+    return _upload_content_addressed("avatars", file_bytes, content_type, thumbnail=False)
+
+def upload_game_image(file_bytes: bytes, content_type: str) -> str:
+    return _upload_content_addressed("games", file_bytes, content_type, thumbnail=True)
+
+
+async def _upload_async(upload_fn, image_file: UploadFile) -> str:
+    file_bytes = await read_upload(image_file)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _upload_pool,
+        partial(
+            upload_fn,
+            file_bytes=file_bytes,
+            content_type=image_file.content_type or "application/octet-stream",
+        ),
     )
 
-    url = sb.storage.from_(BUCKET).get_public_url(key)
-    return url
\ No newline at end of file
+
+async def upload_avatar_async(image_file: UploadFile) -> str:
+    return await _upload_async(upload_avatar, image_file)
+
+
+async def upload_game_image_async(image_file: UploadFile) -> str:
+    return await _upload_async(upload_game_image, image_file)
+
+
+def shutdown() -> None:
+    _upload_pool.shutdown(wait=False, cancel_futures=True)
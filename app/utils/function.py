@@ -1,7 +1,11 @@
 from datetime import datetime
+import re
 import secrets
 import string
 
+THUMBNAIL_SUFFIX = "_thumb.webp"
+_CONTENT_ADDRESSED = re.compile(r"/([0-9a-f]{64})\.\w+$")
+
 def thai_date() -> str:
     now = datetime.now()
     thai_year = now.year + 543
@@ -10,4 +14,15 @@ def thai_date() -> str:
 
 def _gen_code(length: int = 10) -> str:
     alphabet = string.ascii_uppercase + string.digits
-    return "".join(secrets.choice(alphabet) for _ in range(length))
\ No newline at end of file
+    return "".join(secrets.choice(alphabet) for _ in range(length))
+
+
+def thumbnail_url(image_url: str | None) -> str | None:
+    # รูปที่เก็บแบบ content-addressed (ชื่อไฟล์ = sha256) จะมี thumbnail อยู่ข้างๆ เสมอ
+    # (upload_service ปฏิเสธรูปที่สร้าง thumbnail ไม่ได้) รูปแบบอื่นไม่มี thumbnail -> None
+    if not image_url:
+        return None
+    path, sep, query = image_url.partition("?")
+    if not _CONTENT_ADDRESSED.search(path):
+        return None
+    return _CONTENT_ADDRESSED.sub(lambda m: f"/{m.group(1)}{THUMBNAIL_SUFFIX}", path) + sep + query
@@ -0,0 +1,150 @@
+"""baseline schema
+
+ตารางทั้งหมดที่ app ใช้อยู่ (เฉพาะ primary key / unique เดิม)
+ฐานข้อมูลที่มีตารางอยู่แล้วให้ใช้ `alembic stamp 0001` แทนการ upgrade
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONEY = sa.Numeric(12, 2)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False),
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("img_url", sa.String(512)),
+        sa.Column("role", sa.String(20), nullable=False, server_default="USER"),
+        sa.Column("wallet_balance", MONEY, nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "game_category",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+    )
+
+    op.create_table(
+        "games",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("category_id", sa.Integer, nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("price", MONEY, nullable=False),
+        sa.Column("release_date", sa.String(20)),
+        sa.Column("image_url", sa.String(512)),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("subtotal_amount", MONEY, nullable=False, server_default="0"),
+        sa.Column("discount_amount", MONEY, nullable=False, server_default="0"),
+        sa.Column("total_amount", MONEY, nullable=False, server_default="0"),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("release_date", sa.String(20)),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "order_items",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("order_id", sa.Integer, nullable=False),
+        sa.Column("game_id", sa.Integer, nullable=False),
+        sa.Column("unit_price", MONEY, nullable=False),
+        sa.Column("quantity", sa.Integer, nullable=False, server_default="1"),
+    )
+    op.create_index("ix_order_items_order_id", "order_items", ["order_id"])
+
+    op.create_table(
+        "user_game_licenses",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("game_id", sa.Integer, nullable=False),
+        sa.Column("order_id", sa.Integer),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "transactions",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("order_id", sa.Integer),
+        sa.Column("type", sa.String(20), nullable=False),
+        sa.Column("amount", MONEY, nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("processed_at", sa.String(20)),
+    )
+
+    op.create_table(
+        "discount_codes",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("code", sa.String(32), nullable=False),
+        sa.Column("type", sa.String(10), nullable=False),
+        sa.Column("value", MONEY, nullable=False),
+        sa.Column("max_discount", MONEY),
+        sa.Column("usage_limit", sa.Integer),
+        sa.Column("status", sa.String(10), nullable=False, server_default="active"),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_index("ix_discount_codes_code", "discount_codes", ["code"], unique=True)
+
+    op.create_table(
+        "discount_redemptions",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("code_id", sa.Integer, nullable=False),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("order_id", sa.Integer, nullable=False),
+        sa.Column("discount_amount", MONEY, nullable=False),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "daily_game_sales",
+        sa.Column("sale_date", sa.Date, primary_key=True),
+        sa.Column("game_id", sa.Integer, primary_key=True),
+        sa.Column("units", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("revenue", MONEY, nullable=False, server_default="0"),
+    )
+    op.create_index("ix_daily_game_sales_game_id", "daily_game_sales", ["game_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in (
+        "daily_game_sales",
+        "discount_redemptions",
+        "discount_codes",
+        "transactions",
+        "user_game_licenses",
+        "order_items",
+        "orders",
+        "games",
+        "game_category",
+        "users",
+    ):
+        op.drop_table(table)
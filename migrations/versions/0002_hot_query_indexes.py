@@ -0,0 +1,81 @@
+"""indexes for hot queries
+
+ฐานข้อมูลเดิม (stamp 0001 แล้ว upgrade): index แบบ UNIQUE ต้องไม่มีแถวซ้ำอยู่ก่อน
+- user_game_licenses(user_id, game_id)
+- game_category(name)
+upgrade จะตรวจก่อนสร้าง index ใดๆ และหยุดพร้อมจำนวนแถวซ้ำ (MySQL ไม่ rollback DDL
+จึงไม่สร้าง index ไปครึ่งทาง) ให้ลบ/รวมแถวซ้ำเองแล้ว upgrade ใหม่ เช่น
+
+    SELECT user_id, game_id, COUNT(*) FROM user_game_licenses
+    GROUP BY user_id, game_id HAVING COUNT(*) > 1;
+    SELECT name, COUNT(*) FROM game_category GROUP BY name HAVING COUNT(*) > 1;
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (ชื่อ index, ตาราง, คอลัมน์, unique) -> query ที่ใช้
+INDEXES = [
+    # delete_game_and_dependencies: SELECT DISTINCT order_id ... WHERE game_id = :gid
+    ("ix_order_items_game_order", "order_items", ["game_id", "order_id"], False),
+    # purchase_games (เช็คเกมที่มีแล้ว), owns, library
+    ("ux_user_game_licenses_user_game", "user_game_licenses", ["user_id", "game_id"], True),
+    # ลบ license ตามเกม
+    ("ix_user_game_licenses_game", "user_game_licenses", ["game_id", "order_id"], False),
+    # backfill daily_game_sales: WHERE status = 'fulfilled' AND created_at >= ...
+    ("ix_orders_status_created", "orders", ["status", "created_at"], False),
+    # จำนวนการใช้โค้ดส่วนลด
+    ("ix_discount_redemptions_code", "discount_redemptions", ["code_id"], False),
+    # ประวัติธุรกรรม: WHERE user_id = :uid ORDER BY id DESC
+    ("ix_transactions_user_id", "transactions", ["user_id", "id"], False),
+    # เช็คชื่อซ้ำ / นำเข้าเกม: WHERE name = :name / IN (...)
+    ("ix_games_name", "games", ["name"], False),
+    # /games/page?category_id=...: WHERE category_id = :cid AND id > :after ORDER BY id
+    ("ix_games_category_id", "games", ["category_id", "id"], False),
+    ("ux_game_category_name", "game_category", ["name"], True),
+]
+
+
+def _check_no_duplicates() -> None:
+    conn = op.get_bind()
+    problems = []
+    for name, table, columns, unique in INDEXES:
+        if not unique:
+            continue
+        cols = ", ".join(columns)
+        groups = conn.execute(sa.text(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} GROUP BY {cols} HAVING COUNT(*) > 1) d"
+        )).scalar()
+        if groups:
+            problems.append(f"{table}({cols}): {groups} duplicated groups, required by {name}")
+    if problems:
+        raise RuntimeError(
+            "cannot create unique indexes, remove duplicate rows first (see migration docstring): "
+            + "; ".join(problems)
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _check_no_duplicates()
+    for name, table, columns, unique in INDEXES:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
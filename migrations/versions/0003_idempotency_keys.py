@@ -0,0 +1,43 @@
+"""idempotency keys for purchase / top-up
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("user_id", sa.Integer, primary_key=True),
+        sa.Column("idem_key", sa.String(100), primary_key=True),
+        sa.Column("endpoint", sa.String(100), nullable=False),
+        sa.Column("request_hash", sa.String(64), nullable=False),
+        sa.Column("status", sa.String(10), nullable=False, server_default="pending"),
+        # request ที่ถือการจองอยู่ (เปลี่ยนเมื่อ pending ค้างนานแล้วถูก request ใหม่รับช่วง)
+        sa.Column("owner", sa.String(32), nullable=False),
+        sa.Column("response_body", sa.Text),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("expires_at", sa.DateTime, nullable=False),
+    )
+    # purge_expired_idempotency_keys: WHERE expires_at < NOW()
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_idempotency_keys_expires_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
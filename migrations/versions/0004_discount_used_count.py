@@ -0,0 +1,43 @@
+"""discount_codes.used_count
+
+นับการใช้โค้ดไว้ในแถวของโค้ดเอง (แทน COUNT(*) จาก discount_redemptions ทุกครั้งที่ซื้อ)
+และ backfill จาก redemptions ที่มีอยู่
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "discount_codes",
+        sa.Column("used_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.execute("""
+        UPDATE discount_codes dc
+        JOIN (
+            SELECT code_id, COUNT(*) AS used
+            FROM discount_redemptions
+            GROUP BY code_id
+        ) r ON r.code_id = dc.id
+        SET dc.used_count = r.used
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("discount_codes", "used_count")
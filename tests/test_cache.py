@@ -0,0 +1,93 @@
+import threading
+
+from app.core.cache import TTLCache
+
+
+def test_get_set_and_expiry(monkeypatch):
+    from app.core import cache as cache_module
+
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("k", 1)
+    assert cache.get("k") == 1
+    now[0] += 6
+    assert cache.get("k", "missing") == "missing"
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_set_with_stale_version_is_ignored():
+    cache = TTLCache()
+    version = cache.version
+    cache.invalidate()
+    cache.set("k", "old", version=version)
+    assert cache.get("k") is None
+    cache.set("k", "new", version=cache.version)
+    assert cache.get("k") == "new"
+
+
+def test_pop_bumps_version():
+    cache = TTLCache()
+    cache.set("k", 1)
+    version = cache.version
+    cache.pop("k")
+    assert cache.version == version + 1
+    assert cache.get("k") is None
+
+
+def test_load_racing_invalidate_is_not_cached():
+    cache = TTLCache()
+    loading, invalidated = threading.Event(), threading.Event()
+
+    def slow_loader():
+        loading.set()
+        invalidated.wait(5)
+        return "stale"
+
+    result = []
+    worker = threading.Thread(target=lambda: result.append(cache.get_or_load("k", slow_loader)))
+    worker.start()
+    loading.wait(5)
+    cache.invalidate()
+    invalidated.set()
+    worker.join(5)
+
+    assert result == ["stale"]
+    assert cache.get("k") is None
+    assert cache.get_or_load("k", lambda: "fresh") == "fresh"
+    assert cache.get("k") == "fresh"
+
+
+def test_fingerprint_follows_content():
+    cache = TTLCache()
+    a = {"items": [1, 2], "total": 2}
+    assert cache.fingerprint(a) == cache.fingerprint({"total": 2, "items": [1, 2]})
+    assert cache.fingerprint(a) != cache.fingerprint({"items": [1, 2, 3], "total": 3})
+
+
+def test_fingerprint_does_not_retain_dropped_payloads():
+    cache = TTLCache(maxsize=4)
+    for i in range(50):
+        payload = cache.get_or_load("all", lambda: {"items": list(range(i))})
+        cache.fingerprint(payload)
+        cache.invalidate()
+    assert cache._fingerprints == {}
+
+    payload = cache.get_or_load("all", lambda: {"items": [1]})
+    digest = cache.fingerprint(payload)
+    assert cache.fingerprint(payload) == digest
+    assert len(cache._fingerprints) == 1
+    cache.set("all", {"items": [2]})
+    cache.pop("other")
+    assert cache._fingerprints == {}
@@ -0,0 +1,208 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services import idempotency_service as svc
+
+
+class FakeDB:
+    """แทน Session + ตาราง idempotency_keys / ยอดเงิน: การเขียนใน transaction มีผลเมื่อ commit เท่านั้น"""
+
+    def __init__(self):
+        self.keys: dict[tuple[int, str], dict] = {}
+        self.balance = 0
+        self._staged: list = []
+
+    def stage(self, fn):
+        self._staged.append(fn)
+
+    def commit(self):
+        for fn in self._staged:
+            fn()
+        self._staged.clear()
+
+    def rollback(self):
+        self._staged.clear()
+
+
+def _reserve(db, user_id, key, endpoint, request_hash, owner, ttl):
+    if (user_id, key) in db.keys:
+        db.rollback()
+        return False
+    now = datetime.now()
+    db.keys[(user_id, key)] = {
+        "endpoint": endpoint, "request_hash": request_hash, "status": "pending", "owner": owner,
+        "response_body": None, "created_at": now, "expires_at": now + timedelta(seconds=ttl),
+    }
+    db.commit()
+    return True
+
+
+def _get(db, user_id, key):
+    row = db.keys.get((user_id, key))
+    return dict(row) if row else None
+
+
+def _take_over(db, user_id, key, old_owner, owner):
+    row = db.keys.get((user_id, key))
+    ok = bool(row) and row["status"] == "pending" and row["owner"] == old_owner
+    if ok:
+        row.update(owner=owner, created_at=datetime.now())
+    db.commit()
+    return ok
+
+
+def _complete(db, user_id, key, owner, response_body):
+    row = db.keys.get((user_id, key))
+    if not row or row["status"] != "pending" or row["owner"] != owner:
+        return False
+    db.stage(lambda: row.update(status="done", response_body=response_body))
+    return True
+
+
+def _release(db, user_id, key, owner):
+    db.rollback()
+    row = db.keys.get((user_id, key))
+    if row and row["status"] == "pending" and row["owner"] == owner:
+        del db.keys[(user_id, key)]
+    db.commit()
+
+
+def _delete_expired(db, user_id, key):
+    row = db.keys.get((user_id, key))
+    if row and row["expires_at"] < datetime.now():
+        del db.keys[(user_id, key)]
+    db.commit()
+
+
+@pytest.fixture(autouse=True)
+def fake_crud(monkeypatch):
+    monkeypatch.setattr(svc, "_completed", TTLCache())
+    for name, fn in {
+        "reserve_idempotency_key": _reserve,
+        "get_idempotency_key": _get,
+        "take_over_idempotency_key": _take_over,
+        "complete_idempotency_key": _complete,
+        "release_idempotency_key": _release,
+        "delete_expired_idempotency_key": _delete_expired,
+    }.items():
+        monkeypatch.setattr(svc.crud_idem, name, fn)
+
+
+def _top_up(db: FakeDB, amount: int):
+    """แบบเดียวกับ crud.wallet: เขียนยอดเงิน -> before_commit(result) -> commit (rollback เป็นหน้าที่ของ release)"""
+
+    def fn(before_commit):
+        db.stage(lambda: setattr(db, "balance", db.balance + amount))
+        result = {"balance": db.balance + amount}
+        if before_commit:
+            before_commit(result)
+        db.commit()
+        return result
+
+    return fn
+
+
+def _run(db, key, amount=100, response=None):
+    return svc.run_idempotent(
+        db, response or Response(), 1, key, "topup", {"amount": amount}, _top_up(db, amount),
+    )
+
+
+def test_without_key_runs_every_time():
+    db = FakeDB()
+    _run(db, None)
+    _run(db, None)
+    assert db.balance == 200
+    assert db.keys == {}
+
+
+def test_replay_returns_stored_result_without_charging_again():
+    db = FakeDB()
+    assert _run(db, "k") == {"balance": 100}
+    assert db.keys[(1, "k")]["status"] == "done"
+
+    response = Response()
+    assert _run(db, "k", response=response) == {"balance": 100}
+    assert response.headers["Idempotent-Replayed"] == "true"
+
+    svc._completed.invalidate()  # replay จากตาราง (worker อื่น / cache หมดอายุ)
+    assert _run(db, "k") == {"balance": 100}
+    assert db.balance == 100
+
+
+def test_same_key_different_request_is_422():
+    db = FakeDB()
+    _run(db, "k", amount=100)
+    with pytest.raises(HTTPException) as exc:
+        _run(db, "k", amount=500)
+    assert exc.value.status_code == 422
+    svc._completed.invalidate()
+    with pytest.raises(HTTPException) as exc:
+        _run(db, "k", amount=500)
+    assert exc.value.status_code == 422
+    assert db.balance == 100
+
+
+def test_fresh_pending_is_409():
+    db = FakeDB()
+    _reserve(db, 1, "k", "topup", svc.request_fingerprint("topup", {"amount": 100}), "other", 60)
+    with pytest.raises(HTTPException) as exc:
+        _run(db, "k")
+    assert exc.value.status_code == 409
+    assert db.balance == 0
+    assert db.keys[(1, "k")]["owner"] == "other"
+
+
+def test_stale_pending_is_taken_over():
+    db = FakeDB()
+    _reserve(db, 1, "k", "topup", svc.request_fingerprint("topup", {"amount": 100}), "dead", 60)
+    db.keys[(1, "k")]["created_at"] -= timedelta(seconds=settings.IDEMPOTENCY_PENDING_TIMEOUT + 1)
+
+    assert _run(db, "k") == {"balance": 100}
+    row = db.keys[(1, "k")]
+    assert row["status"] == "done" and row["owner"] != "dead"
+    assert json.loads(row["response_body"]) == {"balance": 100}
+    assert db.balance == 100
+
+
+def test_error_releases_key_for_retry():
+    db = FakeDB()
+
+    def boom(before_commit):
+        raise HTTPException(status_code=400, detail="ยอดเงินไม่พอ")
+
+    with pytest.raises(HTTPException):
+        svc.run_idempotent(db, Response(), 1, "k", "topup", {"amount": 100}, boom)
+    assert db.keys == {}
+    assert _run(db, "k") == {"balance": 100}
+
+
+def test_completion_lost_after_takeover_aborts_transaction():
+    db = FakeDB()
+    inner = _top_up(db, 100)
+
+    def slow_then_taken_over(before_commit):
+        # request นี้ช้าจนเกิน timeout: retry รับช่วง key ไปก่อนที่จะ complete
+        row = db.keys[(1, "k")]
+        _take_over(db, 1, "k", row["owner"], "retry")
+        return inner(before_commit)
+
+    with pytest.raises(HTTPException) as exc:
+        svc.run_idempotent(db, Response(), 1, "k", "topup", {"amount": 100}, slow_then_taken_over)
+    assert exc.value.status_code == 409
+    assert db.balance == 0  # การเติมเงินถูก rollback
+    row = db.keys[(1, "k")]
+    assert row["status"] == "pending" and row["owner"] == "retry"  # release ไม่ลบการจองของ retry
+
+
+def test_invalid_key_is_400():
+    db = FakeDB()
+    for key in ("", "x" * (svc.MAX_KEY_LENGTH + 1)):
+        with pytest.raises(HTTPException) as exc:
+            _run(db, key)
+        assert exc.value.status_code == 400
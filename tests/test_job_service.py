@@ -0,0 +1,44 @@
+import time
+
+from fastapi import HTTPException
+
+from app.services.job_service import JobRegistry
+
+
+def _wait(registry: JobRegistry, job_id: str) -> dict:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job = registry.get(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_done():
+    registry = JobRegistry(max_workers=1)
+    job = _wait(registry, registry.submit("add", lambda a, b: a + b, 1, 2)["id"])
+    assert (job["status"], job["result"], job["error"]) == ("done", 3, None)
+    registry.shutdown()
+
+
+def test_http_error_is_reported():
+    def fail():
+        raise HTTPException(status_code=404, detail="missing")
+
+    registry = JobRegistry(max_workers=1)
+    job = _wait(registry, registry.submit("fail", fail)["id"])
+    assert job["error"] == {"status_code": 404, "detail": "missing"}
+    registry.shutdown()
+
+
+def test_unexpected_error_is_logged_not_returned(caplog):
+    def crash():
+        raise RuntimeError("password=secret")
+
+    registry = JobRegistry(max_workers=1)
+    job = _wait(registry, registry.submit("crash", crash)["id"])
+    assert job["status"] == "failed"
+    assert job["error"] == {"status_code": 500, "detail": "Internal Server Error"}
+    assert "password=secret" in caplog.text
+    registry.shutdown()
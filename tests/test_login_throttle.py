@@ -0,0 +1,85 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.login_throttle import LoginThrottle, MemoryThrottleBackend
+
+
+def _backend(**kwargs) -> MemoryThrottleBackend:
+    opts = {"window": 60, "lockout_base": 10, "lockout_max": 100, "max_keys": 100}
+    opts.update(kwargs)
+    return MemoryThrottleBackend(**opts)
+
+
+def test_lockout_after_limit():
+    throttle = LoginThrottle(_backend(), max_per_email=3, max_per_ip=100)
+    for _ in range(2):
+        throttle.record_failure("a@example.com", "1.2.3.4")
+    throttle.check("a@example.com", "1.2.3.4")
+
+    throttle.record_failure("A@example.com ", "1.2.3.4")
+    with pytest.raises(HTTPException) as exc:
+        throttle.check("a@example.com", "5.6.7.8")
+    assert exc.value.status_code == 429
+    assert 1 <= int(exc.value.headers["Retry-After"]) <= 11
+    # email อื่นจาก IP เดียวกันยังไม่ถูกบล็อก
+    throttle.check("b@example.com", "1.2.3.4")
+
+
+def test_ip_limit_across_emails():
+    throttle = LoginThrottle(_backend(), max_per_email=100, max_per_ip=3)
+    for i in range(3):
+        throttle.record_failure(f"user{i}@example.com", "1.2.3.4")
+    with pytest.raises(HTTPException):
+        throttle.check("new@example.com", "1.2.3.4")
+    throttle.check("new@example.com", "5.6.7.8")
+
+
+def test_failures_outside_window_are_forgotten():
+    backend = _backend()
+    assert backend.record_failure("k", 0, 3) == 0
+    assert backend.record_failure("k", 10, 3) == 0
+    assert backend.record_failure("k", 70, 3) == 0
+
+
+def test_exponential_backoff_capped():
+    backend = _backend()
+    now, lockouts = 0.0, []
+    for _ in range(6):
+        for _ in range(2):
+            backend.record_failure("k", now, 2)
+        until = backend.blocked_until("k")
+        lockouts.append(until - now)
+        now = until
+    assert lockouts == [10, 20, 40, 80, 100, 100]
+
+
+def test_backoff_restarts_after_quiet_period():
+    backend = _backend()
+    backend.record_failure("k", 0, 1)
+    backend.record_failure("k", 10, 1)
+    assert backend.blocked_until("k") == 30
+    # เงียบนานกว่า lockout_max หลังบล็อกครั้งล่าสุด
+    assert backend.record_failure("k", 131, 1) == 141
+
+
+def test_success_resets_email_only():
+    throttle = LoginThrottle(_backend(), max_per_email=2, max_per_ip=2)
+    for _ in range(2):
+        throttle.record_failure("a@example.com", "1.2.3.4")
+    throttle.record_success("a@example.com", "1.2.3.4")
+    throttle.check("a@example.com", None)
+    with pytest.raises(HTTPException):
+        throttle.check("a@example.com", "1.2.3.4")
+
+
+def test_key_cap_evicts_least_recent():
+    backend = _backend(max_keys=2)
+    backend.record_failure("a", 0, 1)
+    backend.record_failure("b", 0, 1)
+    backend.record_failure("a", 1, 5)
+    backend.record_failure("c", 1, 5)
+    assert backend.blocked_until("b") == 0
+    assert backend.blocked_until("a") > 0
+    stats = backend.stats()
+    assert stats["tracked_keys"] == 2
+    assert stats["evictions"] == 1
@@ -0,0 +1,59 @@
+from app.services.search_service import GameSearchIndex, normalize
+
+GAMES = [
+    {"id": 1, "name": "Elden Ring"},
+    {"id": 2, "name": "Ring Fit Adventure"},
+    {"id": 3, "name": "The Elder Scrolls V: Skyrim"},
+    {"id": 4, "name": "Golden Eye"},
+    {"id": 5, "name": "ELDEN RING Nightreign"},
+    {"id": 6, "name": "Pokémon Red"},
+]
+
+
+def _index() -> GameSearchIndex:
+    index = GameSearchIndex()
+    index.build(GAMES, version=1)
+    return index
+
+
+def _ids(index: GameSearchIndex, keyword: str, limit: int = 20) -> list[int]:
+    return [row["id"] for row in index.search(keyword, limit)]
+
+
+def test_normalize():
+    assert normalize("  The Elder-Scrolls V:  Skyrim ") == "the elder scrolls v skyrim"
+    assert normalize("ＰＯＫÉMON") == "pokémon"
+
+
+def test_exact_match_first():
+    assert _ids(_index(), "elden ring")[0] == 1
+
+
+def test_prefix_leading_word_before_inner_word():
+    # ชื่อที่ขึ้นต้นด้วยคำค้นมาก่อน แล้วเรียงตามความยาวชื่อ
+    assert _ids(_index(), "ring") == [2, 1, 5]
+
+
+def test_multi_word_prefix():
+    assert _ids(_index(), "eld sky") == [3]
+    assert _ids(_index(), "ring eld") == [1, 5]
+
+
+def test_substring_via_trigram():
+    assert _ids(_index(), "lden") == [1, 4, 5]
+    assert _ids(_index(), "xyz") == []
+
+
+def test_limit_and_empty():
+    index = _index()
+    assert len(index.search("e", limit=2)) == 2
+    assert index.search("  ") == []
+
+
+def test_freshness_tied_to_version():
+    index = _index()
+    assert index.is_fresh(1)
+    assert not index.is_fresh(2)
+    index.build([{"id": 9, "name": "New Game"}], version=2)
+    assert index.is_fresh(2)
+    assert _ids(index, "ring") == []
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+from app.core.storage import MemoryStorage
+from app.services.storage_gc import collect_orphans
+
+OLD = datetime.now(timezone.utc) - timedelta(days=30)
+
+
+class _Result:
+    def __init__(self, urls):
+        self._urls = urls
+
+    def scalars(self):
+        return iter(self._urls)
+
+
+class FakeSession:
+    """แทน Session: คืน image_url ชุดปัจจุบัน และเรียก hook หลังแต่ละ query"""
+
+    def __init__(self, urls, on_query=None):
+        self.urls = list(urls)
+        self.on_query = on_query
+        self.queries = 0
+
+    def execute(self, _stmt):
+        self.queries += 1
+        result = _Result(list(self.urls))
+        if self.on_query:
+            self.on_query(self)
+        return result
+
+    def rollback(self):
+        pass
+
+
+def _storage(*keys) -> MemoryStorage:
+    storage = MemoryStorage()
+    for key in keys:
+        storage.put(key, b"x", "image/png")
+        data, ctype, _ = storage._objects[key]
+        storage._objects[key] = (data, ctype, OLD)
+    return storage
+
+
+DIGEST_A, DIGEST_B = "a" * 64, "b" * 64
+KEYS = [
+    f"games/{DIGEST_A}.png", f"games/{DIGEST_A}_thumb.webp",
+    f"games/{DIGEST_B}.png", f"games/{DIGEST_B}_thumb.webp",
+]
+
+
+def test_dry_run_lists_orphans_only():
+    storage = _storage(*KEYS)
+    db = FakeSession([storage.public_url(KEYS[0])])
+    report = collect_orphans(db, dry_run=True, grace_hours=1, storage=storage)
+    assert sorted(report.orphans) == KEYS[2:]
+    assert report.referenced == 2
+    assert len(list(storage.list_objects("games"))) == 4
+
+
+def test_reference_added_during_delete_is_rescued():
+    storage = _storage(*KEYS)
+
+    # หลังรอบ scan ผู้ใช้อัปโหลดรูป B ซ้ำ (key เดิม) และบันทึก URL ก่อน batch ของ B
+    def reupload(db):
+        if db.queries == 2:
+            db.urls.append(storage.public_url(KEYS[2]))
+
+    db = FakeSession([], on_query=reupload)
+    report = collect_orphans(db, dry_run=False, grace_hours=1, batch_size=1, max_batches_per_sec=0, storage=storage)
+
+    remaining = sorted(obj.key for obj in storage.list_objects("games"))
+    assert remaining == KEYS[2:]
+    assert report.deleted == 2
+    assert report.rescued == 2
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import tokens
+from app.core.auth import ADMIN_ROLE, require_account_owner
+from app.core.tokens import TokenData, create_access_token, decode_access_token, revoke_token
+
+
+def _detail(token: str) -> str:
+    with pytest.raises(HTTPException) as exc:
+        decode_access_token(token)
+    assert exc.value.status_code == 401
+    return exc.value.detail
+
+
+def test_roundtrip():
+    token, ttl = create_access_token(7, "USER")
+    data = decode_access_token(token)
+    assert (data.user_id, data.role) == (7, "USER")
+    assert data.exp - time.time() <= ttl
+
+
+def test_bad_signature():
+    token, _ = create_access_token(7, "USER")
+    payload, _, signature = token.partition(".")
+    forged = signature[:-1] + ("A" if signature[-1] != "A" else "B")
+    assert _detail(f"{payload}.{forged}") == "Invalid token"
+    assert _detail(payload) == "Invalid token"
+
+
+def test_tampered_payload():
+    token, _ = create_access_token(7, "USER")
+    _, _, signature = token.partition(".")
+    admin, _ = create_access_token(7, ADMIN_ROLE)
+    admin_payload = admin.partition(".")[0]
+    assert _detail(f"{admin_payload}.{signature}") == "Invalid token"
+
+
+def test_signed_garbage_payload():
+    payload = tokens._b64encode(b'{"sub": 1}')
+    assert _detail(f"{payload}.{tokens._sign(payload)}") == "Invalid token"
+
+
+def test_expired(monkeypatch):
+    token, ttl = create_access_token(7, "USER")
+    decode_access_token(token)  # อยู่ใน cache แล้วก็ยังต้องหมดอายุ
+    now = time.time()
+    monkeypatch.setattr(tokens.time, "time", lambda: now + ttl + 1)
+    assert _detail(token) == "Token expired"
+
+
+def test_revoked():
+    token, _ = create_access_token(7, "USER")
+    other, _ = create_access_token(7, "USER")
+    revoke_token(decode_access_token(token))
+    assert _detail(token) == "Token revoked"
+    assert decode_access_token(other).user_id == 7
+
+
+def _user(user_id: int, role: str = "USER") -> TokenData:
+    return TokenData(user_id=user_id, role=role, jti="x", exp=int(time.time()) + 60)
+
+
+def test_account_owner_allowed():
+    current = _user(5)
+    assert require_account_owner(user_id=5, current=current) is current
+
+
+def test_account_owner_admin_allowed():
+    current = _user(1, ADMIN_ROLE)
+    assert require_account_owner(user_id=5, current=current) is current
+
+
+def test_account_owner_other_user_forbidden():
+    with pytest.raises(HTTPException) as exc:
+        require_account_owner(user_id=5, current=_user(6))
+    assert exc.value.status_code == 403
@@ -0,0 +1,27 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.storage import MemoryStorage
+from app.services import upload_service
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    storage = MemoryStorage()
+    monkeypatch.setattr(upload_service, "get_storage", lambda: storage)
+    return storage
+
+
+def test_extension_comes_from_content_type(storage):
+    url = upload_service.upload_avatar(b"<html>", "image/png")
+    assert url.endswith(".png")
+    assert upload_service.upload_avatar(b"jpeg", "image/jpeg").endswith(".jpg")
+    assert all(obj.key.rsplit(".", 1)[-1] in {"png", "jpg"} for obj in storage.list_objects("avatars"))
+
+
+@pytest.mark.parametrize("content_type", ["text/html", "image/svg+xml", "application/octet-stream", ""])
+def test_other_content_types_rejected(storage, content_type):
+    with pytest.raises(HTTPException) as exc:
+        upload_service.upload_avatar(b"x", content_type)
+    assert exc.value.status_code == 400
+    assert list(storage.list_objects("avatars")) == []